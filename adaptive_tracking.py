@@ -0,0 +1,138 @@
+from collections import namedtuple
+import numpy as np
+import cv2
+
+# What to do with one captured frame. With skip set, `landmarks` are used as
+# the result and nothing is sent to MediaPipe. Otherwise `roi` is the
+# (x0, y0, x1, y1) pixel box to crop (None for the whole frame) and `size` the
+# (width, height) the crop is scaled to before inference (None to keep it).
+TrackingPlan = namedtuple("TrackingPlan", ["skip", "roi", "size", "landmarks"])
+
+full_frame_plan = TrackingPlan(False, None, None, None)
+
+thumbnail_size = (32, 32)
+
+
+class AdaptiveTracking:
+    # Decides per frame how much hand tracking to do:
+    # - no hand known: run on the full frame
+    # - hand known: run on a square region around its bounding box, scaled
+    #   down further the longer tracking has held (confidence). MediaPipe
+    #   runs in tracking mode and follows the hand from its previous
+    #   landmarks, which are in crop coordinates, so the region and its
+    #   scale stay fixed while the hand stays well inside and its size holds.
+    #   The region is only moved or rescaled when the hand nears its edge,
+    #   shrinks to under `regrow` of it, or the confidence scale differs by
+    #   more than `rescale`.
+    # - hand nearly still, both in landmarks and in the pixels of its region:
+    #   skip inference for up to `max_skip` frames and extrapolate the last
+    #   two results instead
+    # Confidence is the run of consecutive detections, since the backends
+    # return landmarks only.
+    def __init__(self, frame_width, frame_height, margin=0.35, min_roi=64, min_size=96, max_size=192,
+                 confident_streak=5, still_speed=0.05, still_pixels=3.0, max_skip=2, regrow=0.5, rescale=0.25):
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.margin = margin  # Added around the hand box on each side, as a fraction of its longer side
+        self.min_roi = min_roi
+        self.min_size = min_size
+        self.max_size = max_size
+        self.confident_streak = confident_streak
+        self.still_speed = still_speed  # Normalized units per second
+        self.still_pixels = still_pixels  # Mean absolute grey-level change of the region
+        self.max_skip = max_skip
+        self.regrow = regrow
+        self.rescale = rescale
+        self.regions = 0  # Times a region was placed or moved
+        self.frames_full = 0
+        self.frames_roi = 0
+        self.frames_skipped = 0
+        self.reset()
+
+    def reset(self):
+        self._last = None  # (landmarks, timestamp) of the newest detection
+        self._previous = None
+        self._roi = None
+        self._size = None  # Inference size the region is scaled to, fixed with the region
+        self._reference = None  # Thumbnail of the region when it was last tracked
+        self._streak = 0
+        self._skips = 0
+
+    def _thumbnail(self, frame, roi):
+        x0, y0, x1, y1 = roi
+        grey = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        return cv2.resize(grey, thumbnail_size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _bounding_roi(self, hand):
+        xs = hand[:, 0] * self.frame_width
+        ys = hand[:, 1] * self.frame_height
+        side = max(xs.max() - xs.min(), ys.max() - ys.min())
+        side = min(max(side * (1 + 2 * self.margin), self.min_roi), self.frame_width, self.frame_height)
+        cx = (xs.max() + xs.min()) / 2
+        cy = (ys.max() + ys.min()) / 2
+        x0 = int(min(max(cx - side / 2, 0), self.frame_width - side))
+        y0 = int(min(max(cy - side / 2, 0), self.frame_height - side))
+        return (x0, y0, x0 + int(side), y0 + int(side))
+
+    def _speed(self):
+        if self._previous is None:
+            return float('inf')
+        (hands, timestamp), (previous_hands, previous_timestamp) = self._last, self._previous
+        dt = max(timestamp - previous_timestamp, 1e-6)
+        return float(np.abs(hands[..., :2] - previous_hands[..., :2]).max()) / dt
+
+    def _extrapolate(self, timestamp):
+        (hands, last_time), (previous_hands, previous_time) = self._last, self._previous
+        velocity = (hands - previous_hands) / max(last_time - previous_time, 1e-6)
+        return (hands + velocity * (timestamp - last_time)).astype(np.float32)
+
+    def plan(self, frame, timestamp):
+        if self._roi is None:
+            self.frames_full += 1
+            return full_frame_plan
+        if self._skips < self.max_skip and self._speed() < self.still_speed:
+            change = np.abs(self._thumbnail(frame, self._roi) - self._reference).mean()
+            if change < self.still_pixels:
+                self._skips += 1
+                self.frames_skipped += 1
+                return TrackingPlan(True, self._roi, None, self._extrapolate(timestamp))
+        self._skips = 0
+        self.frames_roi += 1
+        return TrackingPlan(False, self._roi, self._size, None)
+
+    def _region_size(self, roi):
+        confidence = min(1.0, self._streak / self.confident_streak)
+        longest = self.max_size - confidence * (self.max_size - self.min_size)
+        x0, y0, x1, y1 = roi
+        scale = min(1.0, longest / max(x1 - x0, y1 - y0))
+        return (max(1, round((x1 - x0) * scale)), max(1, round((y1 - y0) * scale)))
+
+    def _keeps_region(self, hand, size):
+        # Whether the current region still fits the hand: its bounding box is
+        # inside the region less a small border, is not much smaller than it,
+        # and the scale confidence asks for is close to the fixed one
+        x0, y0, x1, y1 = self._roi
+        side = x1 - x0
+        border = side * self.margin / (1 + 2 * self.margin) / 2
+        xs = hand[:, 0] * self.frame_width
+        ys = hand[:, 1] * self.frame_height
+        inside = (xs.min() >= x0 + border and xs.max() <= x1 - border and
+                  ys.min() >= y0 + border and ys.max() <= y1 - border)
+        hand_side = max(xs.max() - xs.min(), ys.max() - ys.min())
+        return (inside and hand_side * (1 + 2 * self.margin) >= self.regrow * side and
+                abs(size[0] - self._size[0]) <= self.rescale * self._size[0])
+
+    def observe(self, plan, hands, timestamp, frame):
+        # Called with every published result, in capture order
+        if plan.skip:
+            return
+        if not len(hands):
+            self.reset()
+            return
+        self._streak += 1
+        self._previous, self._last = self._last, (hands[:1].copy(), timestamp)
+        if self._roi is None or not self._keeps_region(hands[0], self._region_size(self._roi)):
+            self._roi = self._bounding_roi(hands[0])
+            self._size = self._region_size(self._roi)
+            self.regions += 1
+        self._reference = self._thumbnail(frame, self._roi)
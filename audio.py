@@ -0,0 +1,94 @@
+import time
+import numpy as np
+import pygame
+from pygame import mixer
+
+# name: (pitch Hz, length in samples at 44.1 kHz, volume, group, priority, minimum ms between starts)
+sound_specs = {
+    "shoot": (440, 8000, 0.3, "weapons", 1, 40),
+    "zombie_death": (220, 8000, 0.4, "deaths", 2, 60),
+    "game_over": (110, 16000, 0.5, "ui", 10, 0),
+}
+
+# Mixer channels reserved for each group of sounds
+channel_groups = {"weapons": 3, "deaths": 3, "ui": 1}
+
+
+class SoundBank:
+    # Sine tones rendered once, straight into the mixer's own sample format
+    # and channel count, and shared by every voice that plays them.
+    def __init__(self):
+        self.frequency, self.format, self.channels = mixer.get_init()
+        self._sounds = {}
+
+    def tone(self, pitch, samples, volume):
+        key = (pitch, samples, volume)
+        sound = self._sounds.get(key)
+        if sound is None:
+            length = round(samples * self.frequency / 44100)
+            wave = np.sin(2 * np.pi * pitch * np.arange(length) / self.frequency)
+            if abs(self.format) == 32:  # pygame reports a float32 mixer as -32
+                data = wave.astype(np.float32)
+            else:
+                bits = abs(self.format)
+                peak = 2 ** (bits - 1) - 1
+                data = wave * peak if self.format < 0 else (wave + 1) * peak
+                data = data.astype(f"{'i' if self.format < 0 else 'u'}{bits // 8}")
+            data = np.ascontiguousarray(np.repeat(data[:, None], self.channels, axis=1))
+            sound = pygame.sndarray.make_sound(data if self.channels > 1 else data[:, 0])
+            sound.set_volume(volume)
+            self._sounds[key] = sound
+        return sound
+
+
+class AudioManager:
+    # Plays named sounds on a fixed set of mixer channels split into groups,
+    # so a burst of one kind (flamethrower fire, a chain of deaths) cannot
+    # take the channels another kind needs. A sound that restarts sooner
+    # than its minimum interval is dropped. When its group has no free
+    # channel, the voice with the lowest priority, and among those the
+    # oldest, is stolen, provided it does not outrank the new sound.
+    def __init__(self, bank, specs=sound_specs, groups=channel_groups):
+        self.specs = specs
+        self.sounds = {name: bank.tone(pitch, samples, volume) for name, (pitch, samples, volume, *_) in specs.items()}
+        total = sum(groups.values())
+        mixer.set_num_channels(total)
+        mixer.set_reserved(total)  # Keep Sound.play() off the managed channels
+        self.groups = {}
+        first = 0
+        for group, count in groups.items():
+            self.groups[group] = list(range(first, first + count))
+            first += count
+        self._channels = [mixer.Channel(i) for i in range(total)]
+        self._priority = [0] * total
+        self._started = [0.0] * total
+        self._last_start = {name: -float('inf') for name in specs}
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0  # Rate-limited or outranked
+        self.dropped_by_sound = {name: 0 for name in specs}
+
+    def play(self, name, now=None):
+        _, _, _, group, priority, min_interval = self.specs[name]
+        now = time.perf_counter() * 1000 if now is None else now
+        if now - self._last_start[name] < min_interval:
+            self._drop(name)
+            return False
+        channels = self.groups[group]
+        voice = next((i for i in channels if not self._channels[i].get_busy()), None)
+        if voice is None:
+            voice = min(channels, key=lambda i: (self._priority[i], self._started[i]))
+            if self._priority[voice] > priority:
+                self._drop(name)
+                return False
+            self.stolen += 1
+        self._channels[voice].play(self.sounds[name])
+        self._priority[voice] = priority
+        self._started[voice] = now
+        self._last_start[name] = now
+        self.played += 1
+        return True
+
+    def _drop(self, name):
+        self.dropped += 1
+        self.dropped_by_sound[name] += 1
@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import Zombie_handtracking_game as game
+from world import World, Barricade, ShieldPickup, AmmoPickup, HealthKit, autopilot, tick_ms
+from profiler import FrameProfiler
+from gc_monitor import GCMonitor
+from renderer import DirtyRenderer
+from quality import quality_levels
+
+stages = ("sim", "collisions", "draw", "display", "gc")
+percentiles = (50, 95, 99)
+zombie_types = ["normal", "fast", "strong", "exploding"]
+
+
+class Scenario:
+    # A world set up for one kind of load. `fill` zombies are kept alive by
+    # topping the store back up before every tick (outside the timed stages),
+    # and the player cannot die, so the load stays steady for the whole run.
+    def __init__(self, name, fill=0, zombie_type=None, weapon="pistol", bosses=0, barricades=3, pickups=4,
+                 no_cooldown=False):
+        self.name = name
+        self.fill = fill
+        self.zombie_type = zombie_type
+        self.weapon = weapon
+        self.bosses = bosses
+        self.barricades = barricades
+        self.pickups = pickups
+        self.no_cooldown = no_cooldown
+
+    def setup(self, world):
+        world.new_game()
+        rng = world.rng
+        world.player_health = 10**9
+        world.current_weapon = self.weapon
+        world.ammo[self.weapon] = float('inf')
+        world.barricades = [Barricade(rng, world.width, world.height) for _ in range(self.barricades)]
+        pickup_types = [ShieldPickup, AmmoPickup, HealthKit]
+        world.pickups = [pickup_types[i % 3](rng, world.width, world.height) for i in range(self.pickups)]
+        world.scheduler.cancel(world.pickup_spawn_timer)
+        for _ in range(self.bosses):
+            world.zombies.spawn("boss", world.clock.now())
+        world.boss_spawned = self.bosses > 0
+
+    def before_tick(self, world):
+        now = world.clock.now()
+        while len(world.zombies) < self.fill + self.bosses:
+            world.zombies.spawn(self.zombie_type or world.rng.choice(zombie_types), now)
+        if self.no_cooldown:
+            world.last_shoot_time = -float('inf')
+
+
+scenarios = {s.name: s for s in [
+    Scenario("zombies_10", fill=10),
+    Scenario("zombies_100", fill=100),
+    Scenario("zombies_1000", fill=1000),
+    Scenario("zombies_5000", fill=5000),
+    Scenario("flamethrower_spam", fill=200, weapon="flamethrower", no_cooldown=True),
+    Scenario("rocket_chain", fill=400, zombie_type="exploding", weapon="rocket", no_cooldown=True),
+    Scenario("boss_wave", fill=100, bosses=20),
+    Scenario("full_pickups_barricades", fill=300, barricades=30, pickups=6),
+]}
+
+
+def run_scenario(scenario, ticks, warmup, seed, window, camera_surface, fonts, quality=quality_levels[0]):
+    profiler = FrameProfiler(stages, frames=ticks)
+    world = World(game.width, game.height, rng=random.Random(seed), profiler=profiler)
+    scenario.setup(world)
+    window.invalidate()
+    gc_monitor = GCMonitor(profiler)
+    for tick in range(warmup + ticks):
+        if tick == warmup:
+            gc_monitor.start()
+        scenario.before_tick(world)
+        world.step(tick_ms, autopilot(world))
+        world.events.clear()
+        with profiler.section("draw"):
+            game.draw_game_ui(window, *fonts, world, camera_surface, quality, tick % quality.text_interval == 0)
+            game.draw_player(window, world)
+            game.draw_zombies(window, world.zombies)
+            game.draw_projectiles(window, world.bullets, quality.flame_step)
+        with profiler.section("display"):
+            window.present()
+        pygame.event.pump()
+        if tick == warmup - 1:
+            profiler.clear()
+        else:
+            profiler.end_frame()
+        if tick >= warmup:
+            gc_monitor.end_frame()
+    gc_monitor.stop()
+    times = profiler.history() * 1000
+    results = {}
+    for i, stage in enumerate(stages + ("total",)):
+        column = times[:, i] if stage != "total" else times.sum(axis=1)
+        results[stage] = {f"p{p}": round(float(np.percentile(column, p)), 4) for p in percentiles}
+        results[stage]["mean"] = round(float(column.mean()), 4)
+    results["garbage_collection"] = gc_monitor.summary()
+    return results
+
+
+def compare(results, baseline, threshold, min_ms):
+    # A stage regresses when a percentile grew by more than `threshold`
+    # (a fraction) and by at least `min_ms`, which keeps noise on sub-0.1 ms
+    # stages from being reported.
+    regressions = []
+    for name, scenario in results["scenarios"].items():
+        base_scenario = baseline["scenarios"].get(name)
+        if base_scenario is None:
+            continue
+        for stage, values in scenario.items():
+            if stage not in stages + ("total",):
+                continue
+            for key, value in values.items():
+                base = base_scenario.get(stage, {}).get(key)
+                if base is None or key == "mean":
+                    continue
+                if value > base * (1 + threshold) and value - base >= min_ms:
+                    regressions.append(f"{name} {stage} {key}: {base:.3f} -> {value:.3f} ms (+{(value / base - 1) * 100 if base else float('inf'):.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the simulation, collision and drawing stages under stress scenarios")
+    parser.add_argument("--scenario", action="append", choices=sorted(scenarios),
+                        help="scenario to run, may be repeated (all by default)")
+    parser.add_argument("--ticks", type=int, default=300, help="timed ticks per scenario")
+    parser.add_argument("--warmup", type=int, default=30, help="untimed ticks before timing starts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quality", type=int, choices=range(len(quality_levels)), default=0,
+                        help="draw at this level of quality.py's ladder (0 is full quality)")
+    parser.add_argument("--output", default="benchmark.json", help="where to write the results")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown counted as a regression")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="smallest absolute slowdown counted as a regression")
+    args = parser.parse_args()
+
+    screen = pygame.display.set_mode((game.width, game.height))
+    window = DirtyRenderer(screen, game.BLACK)
+    fonts = (game.get_font("consolas", 36), game.get_font("consolas", 24), game.get_font("consolas", 16))
+    quality = quality_levels[args.quality]
+    camera_surface = None
+    if quality.preview:
+        camera_surface = pygame.Surface((game.camera_width, game.camera_height))
+        camera_surface.fill(game.GRAY)
+
+    results = {
+        "meta": {"ticks": args.ticks, "warmup": args.warmup, "seed": args.seed, "quality": quality.name,
+                 "screen": [game.width, game.height], "python": platform.python_version(),
+                 "numpy": np.__version__, "pygame": pygame.version.ver, "machine": platform.machine()},
+        "scenarios": {},
+    }
+    for name in args.scenario or scenarios:
+        result = run_scenario(scenarios[name], args.ticks, args.warmup, args.seed, window, camera_surface, fonts, quality)
+        results["scenarios"][name] = result
+        print(f"{name:26}" + "".join(f"  {stage} {result[stage]['p50']:7.3f}/{result[stage]['p95']:7.3f}"
+                                    for stage in stages + ("total",)))
+    print("(p50/p95 ms per tick)")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import time
+import tracemalloc
+import argparse
+import numpy as np
+import cv2
+import pygame
+
+
+class CameraPreview:
+    # The camera inset as one persistent surface. pygame.image.frombuffer
+    # wraps a preallocated RGB array instead of copying it, so a new frame is
+    # two in-place cv2 calls (mirror back, BGR to RGB) and the surface shows
+    # the result with nothing allocated.
+    def __init__(self, width, height):
+        self._mirrored = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgb = np.empty((height, width, 3), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self._rgb, (width, height), "RGB")
+        self.surface.fill((0, 0, 0))
+        self.updates = 0
+        self.allocated_bytes = 0  # Measured only while tracemalloc is tracing
+        self.traced_updates = 0
+
+    def update(self, frame):
+        # Measured as growth in traced memory, leaving the tracer's peak to
+        # GCMonitor, which resets it once per frame
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            before = tracemalloc.get_traced_memory()[0]
+        cv2.flip(frame, 1, dst=self._mirrored)
+        cv2.cvtColor(self._mirrored, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        if tracing:
+            self.allocated_bytes += max(0, tracemalloc.get_traced_memory()[0] - before)
+            self.traced_updates += 1
+        self.updates += 1
+
+    def bytes_per_update(self):
+        return self.allocated_bytes / self.traced_updates if self.traced_updates else None
+
+
+def make_camera_surface(frame):
+    # The previous path, kept for comparison: a converted copy, a rotated
+    # view and a new Surface every frame
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return pygame.surfarray.make_surface(np.rot90(frame_rgb, k=1))
+
+
+def measure(convert, frames):
+    # Mean µs and traced bytes per frame. Surface pixels come from SDL's
+    # allocator, which tracemalloc cannot see, so new surfaces are counted
+    # by their size.
+    tracemalloc.start()
+    allocated = 0
+    start = time.perf_counter()
+    for frame in frames:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        surface = convert(frame)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+        if surface is not None:
+            allocated += surface.get_width() * surface.get_height() * surface.get_bytesize()
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return elapsed / len(frames) * 1e6, allocated / len(frames)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the camera preview paths")
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--height", type=int, default=240)
+    parser.add_argument("--frames", type=int, default=500)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(8)] * (args.frames // 8)
+    preview = CameraPreview(args.width, args.height)
+    expected = pygame.surfarray.array3d(make_camera_surface(frames[0]))
+    preview.update(frames[0])
+    assert np.array_equal(pygame.surfarray.array3d(preview.surface), expected), "preview paths differ"
+    print(f"{'path':12}{'us/frame':>10}{'bytes/frame':>13}")
+    for name, convert in [("make_surface", make_camera_surface), ("persistent", preview.update)]:
+        micros, allocated = measure(convert, frames)
+        print(f"{name:12}{micros:10.1f}{allocated:13.0f}")
@@ -0,0 +1,337 @@
+import threading
+import time
+import logging
+import multiprocessing
+from collections import namedtuple, deque
+from multiprocessing import shared_memory
+import numpy as np
+import cv2
+from gestures import NUM_LANDMARKS, HAND_CONNECTIONS
+from profiler import null_profiler
+from adaptive_tracking import full_frame_plan
+
+# One published result from the tracking thread. `timestamp` is the
+# time.perf_counter() value taken right after the frame was captured and
+# `hand_landmarks` is a float32 array of shape (hands, 21, 3) holding
+# normalized x, y, z per landmark. `frame` is the annotated camera frame, or
+# None while HandTracker.preview is off; it is a reused buffer, so convert it
+# promptly rather than keeping it.
+TrackedFrame = namedtuple("TrackedFrame", ["frame_id", "timestamp", "frame", "hand_landmarks"])
+
+preview_buffers = 3
+
+
+def landmarks_to_array(multi_hand_landmarks, max_hands):
+    hands = multi_hand_landmarks[:max_hands] if multi_hand_landmarks else []
+    array = np.empty((len(hands), NUM_LANDMARKS, 3), dtype=np.float32)
+    for h, hand in enumerate(hands):
+        array[h] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]  # One conversion per hand
+    return array
+
+
+def run_hands(hands, frame, max_hands, roi=None, size=None):
+    # Runs MediaPipe Hands on the `roi` crop of a BGR frame, scaled to `size`,
+    # and returns landmarks normalized to the whole frame
+    frame_height, frame_width = frame.shape[:2]
+    x0, y0, x1, y1 = roi if roi is not None else (0, 0, frame_width, frame_height)
+    image = frame[y0:y1, x0:x1]
+    if size is not None and size != (x1 - x0, y1 - y0):
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    results = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    hand_array = landmarks_to_array(results.multi_hand_landmarks, max_hands)
+    if roi is not None:
+        hand_array[..., 0] = (x0 + hand_array[..., 0] * (x1 - x0)) / frame_width
+        hand_array[..., 1] = (y0 + hand_array[..., 1] * (y1 - y0)) / frame_height
+        hand_array[..., 2] *= (x1 - x0) / frame_width
+    return hand_array
+
+
+def draw_landmarks(frame, hand):
+    frame_height, frame_width = frame.shape[:2]
+    points = [(int(x * frame_width), int(y * frame_height)) for x, y, _ in hand]
+    for start, end in HAND_CONNECTIONS:
+        cv2.line(frame, points[start], points[end], (224, 224, 224), 2)
+    for point in points:
+        cv2.circle(frame, point, 3, (0, 0, 255), -1)
+
+
+class LatestValue:
+    # Single-slot mailbox. The writer replaces the reference and readers grab
+    # whatever is there; a reference assignment is atomic, so neither side
+    # ever takes a lock or waits on the other.
+    def __init__(self):
+        self._value = None
+
+    def set(self, value):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+
+class FrameRing:
+    # Fixed ring of BGR frames plus one landmark block per slot. With
+    # shared=True both live in a single SharedMemory segment so a tracker
+    # process can read frames and write landmarks without any copies.
+    def __init__(self, slots, frame_height, frame_width, max_hands, shared=False, name=None):
+        self.slots = slots
+        self.frame_height = frame_height
+        self.frame_width = frame_width
+        self.max_hands = max_hands
+        frame_shape = (slots, frame_height, frame_width, 3)
+        landmark_shape = (slots, max_hands, NUM_LANDMARKS, 3)
+        frame_bytes = int(np.prod(frame_shape))
+        landmark_bytes = int(np.prod(landmark_shape)) * 4
+        self._owner = name is None
+        self.shm = None
+        if shared or name is not None:
+            if name is None:
+                self.shm = shared_memory.SharedMemory(create=True, size=frame_bytes + landmark_bytes)
+            else:
+                self.shm = shared_memory.SharedMemory(name=name)
+            buf = self.shm.buf
+        else:
+            buf = bytearray(frame_bytes + landmark_bytes)
+        self.frames = np.ndarray(frame_shape, dtype=np.uint8, buffer=buf)
+        self.landmarks = np.ndarray(landmark_shape, dtype=np.float32, buffer=buf, offset=frame_bytes)
+
+    @property
+    def name(self):
+        return self.shm.name if self.shm is not None else None
+
+    def close(self):
+        # Drop the array views first, the segment cannot close while exported
+        self.frames = None
+        self.landmarks = None
+        if self.shm is not None:
+            self.shm.close()
+            if self._owner:
+                self.shm.unlink()
+            self.shm = None
+
+
+class InProcessBackend:
+    depth = 1
+
+    def __init__(self, hands, max_hands):
+        self.hands = hands
+        self.max_hands = max_hands
+        self._requests = {}
+
+    def submit(self, ring, slot, roi=None, size=None):
+        self._requests[slot] = (roi, size)
+
+    def collect(self, ring, slot):
+        roi, size = self._requests.pop(slot, (None, None))
+        return run_hands(self.hands, ring.frames[slot], self.max_hands, roi, size)
+
+    def close(self):
+        self.hands.close()
+
+
+def tracker_worker(ring_name, slots, frame_height, frame_width, max_hands,
+                   min_detection_confidence, min_tracking_confidence, requests, replies):
+    import mediapipe as mp
+    ring = FrameRing(slots, frame_height, frame_width, max_hands, name=ring_name)
+    hands = mp.solutions.hands.Hands(max_num_hands=max_hands,
+                                     min_detection_confidence=min_detection_confidence,
+                                     min_tracking_confidence=min_tracking_confidence)
+    replies.put((-1, 0))  # Ready
+    try:
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            slot, roi, size = request
+            try:
+                hand_array = run_hands(hands, ring.frames[slot], max_hands, roi, size)
+                ring.landmarks[slot, :len(hand_array)] = hand_array
+                replies.put((slot, len(hand_array)))
+            except Exception as e:
+                logging.error(f"Error in tracker process: {e}")
+                replies.put((slot, 0))
+    finally:
+        hands.close()
+        ring.close()
+
+
+class WorkerProcessBackend:
+    # Runs MediaPipe Hands in its own process. Only slot indices, crop boxes
+    # and hand counts cross the queues; pixels and landmarks stay in the
+    # shared ring.
+    depth = 2
+
+    def __init__(self, ring, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 start_timeout=30.0, reply_timeout=2.0):
+        if ring.shm is None:
+            raise ValueError("WorkerProcessBackend needs a shared FrameRing")
+        self.reply_timeout = reply_timeout
+        # Spawned rather than forked: the process is started from a
+        # background thread while the main thread is inside SDL, and a fork
+        # would copy that state and any locks held at that moment
+        context = multiprocessing.get_context("spawn")
+        self._requests = context.Queue()
+        self._replies = context.Queue()
+        self._process = context.Process(
+            target=tracker_worker, name="hand-tracker-process", daemon=True,
+            args=(ring.name, ring.slots, ring.frame_height, ring.frame_width, ring.max_hands,
+                  min_detection_confidence, min_tracking_confidence, self._requests, self._replies))
+        self._process.start()
+        try:
+            self._replies.get(timeout=start_timeout)
+        except Exception:
+            self.close()
+            raise RuntimeError("tracker process did not become ready")
+        logging.info(f"Tracker process started (pid {self._process.pid})")
+
+    def submit(self, ring, slot, roi=None, size=None):
+        self._requests.put((slot, roi, size))
+
+    def collect(self, ring, slot):
+        if not self._process.is_alive():
+            raise RuntimeError("tracker process exited")
+        reply_slot, count = self._replies.get(timeout=self.reply_timeout)
+        if reply_slot != slot:
+            raise RuntimeError(f"tracker process answered slot {reply_slot}, expected {slot}")
+        return ring.landmarks[slot, :count].copy()
+
+    def close(self):
+        if self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+
+
+class HandTracker:
+    def __init__(self, cap, backend, ring, fallback=None, controller=None):
+        self.cap = cap
+        self.backend = backend
+        self.ring = ring
+        self.fallback = fallback  # Called to build an in-process backend if the current one fails
+        self.controller = controller  # Optional AdaptiveTracking; without one every frame is tracked in full
+        self._slot = LatestValue()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last_seen_id = 0
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_processed = 0  # Frames sent through MediaPipe
+        self.process_seconds = 0.0  # Time spent waiting on backend.collect()
+        self.profiler = null_profiler  # Optional FrameProfiler with "capture" and "track" stages
+        self.preview = True  # Whether published results carry an annotated frame
+        self.draw_landmarks = True  # Whether that frame has the hand skeleton drawn on it
+        self.tracking_interval = 1  # Track every nth frame read; the others are read and thrown away
+        self.frames_thinned = 0
+        self._frames_read = 0
+        frame_shape = (ring.frame_height, ring.frame_width, 3)
+        self._resized = np.empty(frame_shape, dtype=np.uint8)
+        # Published frames rotate through these, so the main thread has a
+        # few results' time to convert one before it is written again
+        self._previews = np.empty((preview_buffers,) + frame_shape, dtype=np.uint8)
+        self._next_preview = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="hand-tracker", daemon=True)
+        self._thread.start()
+        logging.info("Hand tracking thread started")
+
+    def stop(self, timeout=3.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _capture(self, slot):
+        ret, frame = self.cap.read()
+        if not ret:
+            return False
+        self._frames_read += 1
+        if self._frames_read % self.tracking_interval:
+            self.frames_thinned += 1
+            return False
+        cv2.resize(frame, (self.ring.frame_width, self.ring.frame_height), dst=self._resized)
+        cv2.flip(self._resized, 1, dst=self.ring.frames[slot])  # Horizontal flip straight into the ring
+        return True
+
+    def _publish(self, slot, frame_id, timestamp, plan):
+        if plan.skip:
+            hand_landmarks = plan.landmarks
+        else:
+            start = time.perf_counter()
+            hand_landmarks = self.backend.collect(self.ring, slot)
+            self.process_seconds += time.perf_counter() - start
+            self.frames_processed += 1
+        if self.controller is not None:
+            self.controller.observe(plan, hand_landmarks, timestamp, self.ring.frames[slot])
+        frame = None
+        if self.preview:
+            frame = self._previews[self._next_preview]
+            self._next_preview = (self._next_preview + 1) % preview_buffers
+            np.copyto(frame, self.ring.frames[slot])
+            if self.draw_landmarks:
+                for hand in hand_landmarks:
+                    draw_landmarks(frame, hand)
+        self._slot.set(TrackedFrame(frame_id, timestamp, frame, hand_landmarks))
+
+    def _run(self):
+        pending = deque()
+        next_slot = 0
+        while not self._stop_event.is_set():
+            try:
+                # While the backend works on earlier slots the next frame is
+                # captured, so a tracker process overlaps with cap.read()
+                captured = False
+                if len(pending) < self.backend.depth:
+                    with self.profiler.section("capture"):
+                        captured = self._capture(next_slot)
+                    if captured:
+                        self.frames_captured += 1
+                        timestamp = time.perf_counter()
+                        plan = full_frame_plan
+                        if self.controller is not None:
+                            plan = self.controller.plan(self.ring.frames[next_slot], timestamp)
+                        if not plan.skip:
+                            self.backend.submit(self.ring, next_slot, plan.roi, plan.size)
+                        pending.append((next_slot, self.frames_captured, timestamp, plan))
+                        next_slot = (next_slot + 1) % self.ring.slots
+                if pending and (len(pending) >= self.backend.depth or not captured):
+                    with self.profiler.section("track"):
+                        self._publish(*pending.popleft())
+                    self.profiler.end_frame()
+                elif not captured:
+                    time.sleep(0.005)
+            except Exception as e:
+                logging.error(f"Error in hand tracking thread: {e}")
+                pending.clear()
+                if self.controller is not None:
+                    self.controller.reset()
+                if self.fallback is not None and not isinstance(self.backend, InProcessBackend):
+                    logging.info("Falling back to in-process hand tracking")
+                    fallback, self.fallback = self.fallback, None
+                    self.backend.close()
+                    try:
+                        self.backend = fallback()
+                    except Exception as e:
+                        logging.error(f"In-process hand tracking unavailable: {e}")
+                        return
+                else:
+                    time.sleep(0.05)
+
+    def latest(self):
+        # Newest result, or None before the first frame has been processed.
+        # Results published since the previous call that were never returned
+        # are counted as dropped.
+        tracked = self._slot.get()
+        if tracked is not None and tracked.frame_id > self._last_seen_id:
+            self.frames_dropped += max(0, tracked.frame_id - self._last_seen_id - 1)
+            self._last_seen_id = tracked.frame_id
+        return tracked
+
+    @staticmethod
+    def staleness(tracked):
+        # Seconds between the capture of `tracked` and now.
+        if tracked is None:
+            return float('inf')
+        return time.perf_counter() - tracked.timestamp
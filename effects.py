@@ -0,0 +1,78 @@
+import numpy as np
+import pygame
+
+explosion_life = 20  # Frames an explosion stays on screen
+explosion_growth = 6  # Radius added per frame until max_radius is reached
+
+explosion_dtype = np.dtype([("x", np.float32), ("y", np.float32), ("frame", np.int16), ("max_radius", np.int16)])
+
+_frame_cache = {}  # (color, max_radius) -> list of (surface, radius), one per frame of life
+
+
+def _build_frames(color, max_radius):
+    # Each frame is cropped to its own circle, so a young explosion blits a
+    # few pixels rather than the full max_radius square
+    frames = []
+    radius = 0
+    for frame in range(explosion_life):
+        radius = min(radius + explosion_growth, max_radius)
+        alpha = int(255 * ((explosion_life - frame) / explosion_life))
+        surface = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, (*color, alpha), (radius, radius), radius)
+        frames.append((surface.convert_alpha(), radius))
+    return frames
+
+
+class ExplosionEffects:
+    # Live explosions as a record array. Each frame of the grow-and-fade
+    # animation is rendered once per (color, max_radius) and then only blitted.
+    def __init__(self, color, capacity=64):
+        self.color = tuple(color)
+        self.records = np.zeros(capacity, dtype=explosion_dtype)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, pos, max_radius=100):
+        if self.count == len(self.records):
+            self.records = np.concatenate([self.records, np.zeros(len(self.records), dtype=explosion_dtype)])
+        self.records[self.count] = (pos[0], pos[1], 0, max_radius)
+        self.count += 1
+
+    def frames(self, max_radius):
+        key = (self.color, max_radius)
+        if key not in _frame_cache:
+            _frame_cache[key] = _build_frames(self.color, max_radius)
+        return _frame_cache[key]
+
+    def advance(self):
+        # Moves every explosion one frame on and drops the ones that have finished
+        n = self.count
+        if n == 0:
+            return
+        live = self.records[:n]
+        live["frame"] += 1
+        keep = live[live["frame"] < explosion_life]
+        self.count = len(keep)
+        self.records[:self.count] = keep
+
+    def draw(self, surface, limit=None):
+        # With a limit only the newest `limit` explosions are drawn
+        n = self.count
+        if n == 0:
+            return
+        blits = []
+        first = 0 if limit is None else max(0, n - limit)
+        for x, y, frame, max_radius in self.records[first:n].tolist():
+            sprite, radius = self.frames(max_radius)[frame]
+            blits.append((sprite, (int(x) - radius, int(y) - radius)))
+        surface.blits(blits, doreturn=False)
+
+    def memory_bytes(self):
+        frame_bytes = sum(frame.get_bytesize() * frame.get_width() * frame.get_height()
+                          for frames in _frame_cache.values() for frame, _ in frames)
+        return frame_bytes + self.records.nbytes
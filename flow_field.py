@@ -0,0 +1,112 @@
+import numpy as np
+
+# The eight neighbour offsets (dx, dy), orthogonal ones first so they win ties
+_neighbours = np.array([(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)])
+_neighbour_directions = _neighbours / np.hypot(_neighbours[:, 0], _neighbours[:, 1])[:, None]
+
+
+def _shifted(array, dx, dy, fill):
+    # out[y, x] = array[y + dy, x + dx], with `fill` where that falls off the grid
+    out = np.full_like(array, fill)
+    h, w = array.shape
+    out[max(0, -dy):h - max(0, dy), max(0, -dx):w - max(0, dx)] = \
+        array[max(0, dy):h - max(0, -dy), max(0, dx):w - max(0, -dx)]
+    return out
+
+
+class FlowField:
+    # Shared steering for every zombie. The screen is cut into `cell_size`
+    # cells, and a breadth-first search out from the player's cell gives each
+    # cell its step count to the player around the barricades (8-connected).
+    # A cell with a clear line to the player steers straight at them, as
+    # zombies always did; any other cell points at its neighbour nearest the
+    # player. Both are recomputed only when the player enters another cell or
+    # the barricades change, and directions() reads them for any number of
+    # zombies in one vectorized lookup.
+    def __init__(self, width, height, cell_size=32, clearance=20):
+        self.cell_size = cell_size
+        self.clearance = clearance  # Kept between a barricade's edge and a zombie's centre
+        self.columns = -(-width // cell_size)
+        self.rows = -(-height // cell_size)
+        ys, xs = np.mgrid[0:self.rows, 0:self.columns]
+        self.centres = np.stack([xs, ys], axis=-1) * cell_size + cell_size / 2
+        self.steps = np.full((self.rows, self.columns), np.inf)
+        self.direction = np.zeros((self.rows, self.columns, 2))
+        self.clear = np.ones((self.rows, self.columns), dtype=bool)
+        self.recomputes = 0
+        self._cell = None
+        self._barricades = None
+
+    def cell_of(self, positions):
+        # (rows, columns) of the cells holding each of an (n, 2) array of
+        # positions, clamped to the grid so off-screen zombies use the edge
+        cells = (positions // self.cell_size).astype(np.intp)
+        row = np.minimum(np.maximum(cells[:, 1], 0), self.rows - 1)
+        column = np.minimum(np.maximum(cells[:, 0], 0), self.columns - 1)
+        return row, column
+
+    def update(self, player_pos, barricade_positions, barricade_radius):
+        # Returns True when the field had to be recomputed
+        cell = (min(max(int(player_pos[1] // self.cell_size), 0), self.rows - 1),
+                min(max(int(player_pos[0] // self.cell_size), 0), self.columns - 1))
+        if cell == self._cell and self._barricades is not None and np.array_equal(barricade_positions, self._barricades):
+            return False
+        self._cell = cell
+        self._barricades = barricade_positions.copy()
+        self._compute(cell, barricade_positions, barricade_radius + self.clearance)
+        self.recomputes += 1
+        return True
+
+    def _compute(self, goal, barricades, radius):
+        centres = self.centres
+        player = centres[goal]
+        # Cells covered by a barricade, and cells whose line to the player passes one
+        offsets = centres[None] - barricades[:, None, None]
+        blocked = np.any(np.hypot(offsets[..., 0], offsets[..., 1]) < radius, axis=0)
+        to_player = player - centres
+        length_squared = np.maximum(np.sum(to_player * to_player, axis=-1), 1e-9)
+        t = np.clip(np.sum(-offsets * to_player, axis=-1) / length_squared, 0.0, 1.0)
+        closest = offsets + t[..., None] * to_player
+        self.clear = ~np.any(np.hypot(closest[..., 0], closest[..., 1]) < radius, axis=0)
+        blocked[goal] = False
+
+        # Breadth-first search as a wavefront over the whole grid
+        steps = np.full(blocked.shape, np.inf)
+        steps[goal] = 0
+        frontier = np.zeros(blocked.shape, dtype=bool)
+        frontier[goal] = True
+        unvisited = ~blocked
+        unvisited[goal] = False
+        rows = np.empty_like(frontier)
+        reached = np.empty_like(frontier)
+        distance = 0
+        while frontier.any():
+            distance += 1
+            # A 3x3 dilation done as a vertical then a horizontal pass
+            rows[:] = frontier
+            rows[1:] |= frontier[:-1]
+            rows[:-1] |= frontier[1:]
+            reached[:] = rows
+            reached[:, 1:] |= rows[:, :-1]
+            reached[:, :-1] |= rows[:, 1:]
+            np.logical_and(reached, unvisited, out=frontier)
+            unvisited &= ~frontier
+            steps[frontier] = distance
+        self.steps = steps
+
+        neighbour_steps = np.stack([_shifted(steps, dx, dy, np.inf) for dx, dy in _neighbours])
+        best = np.argmin(neighbour_steps, axis=0)
+        self.direction = _neighbour_directions[best]
+        # Cells with no way through keep steering straight at the player
+        self.clear |= np.isinf(steps)
+
+    def directions(self, positions, player_pos):
+        # Unit vectors to move along for every row of `positions`, and the
+        # straight-line distance to the player (0 where a zombie is on them)
+        delta = np.asarray(player_pos, dtype=np.float64) - positions
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        row, column = self.cell_of(positions)
+        direction = self.direction[row, column]
+        straight = self.clear[row, column] & (dist > 0)
+        direction[straight] = delta[straight] / dist[straight, None]
+        return direction, dist
@@ -0,0 +1,136 @@
+import os
+import time
+import numpy as np
+import cv2
+
+image_extensions = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource:
+    # Base for everything HandTracker can read frames from. Sources follow the
+    # small part of the cv2.VideoCapture interface the tracker uses (isOpened,
+    # read, release). With realtime=False frames are returned as fast as they
+    # can be produced; otherwise read() waits so frames arrive at `fps`.
+    def __init__(self, fps=30.0, realtime=True):
+        self.fps = fps
+        self.realtime = realtime
+        self.frames_read = 0
+        self._next_time = None
+
+    def isOpened(self):
+        return True
+
+    def _pace(self):
+        if not self.realtime or not self.fps:
+            return
+        now = time.perf_counter()
+        if self._next_time is None or now - self._next_time > 1.0:
+            self._next_time = now  # First frame, or we fell far behind: restart the schedule
+        elif self._next_time > now:
+            time.sleep(self._next_time - now)
+        self._next_time += 1.0 / self.fps
+
+    def read(self):
+        self._pace()
+        frame = self._read_frame()
+        if frame is None:
+            return False, None
+        self.frames_read += 1
+        return True, frame
+
+    def _read_frame(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class WebcamSource(FrameSource):
+    # The camera paces itself, so no extra waiting is done here
+    def __init__(self, index=0):
+        super().__init__(fps=None, realtime=False)
+        self.cap = cv2.VideoCapture(index)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _read_frame(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, realtime=True, loop=True):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(fps=self.cap.get(cv2.CAP_PROP_FPS) or 30.0, realtime=realtime)
+        self.loop = loop
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _read_frame(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self.frames_read:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    # Image files in name order, decoded as they are read
+    def __init__(self, path, fps=30.0, realtime=True, loop=True):
+        super().__init__(fps=fps, realtime=realtime)
+        self.paths = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(image_extensions))
+        self.loop = loop
+        self._index = 0
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def _read_frame(self):
+        if self._index == len(self.paths):
+            if not self.loop:
+                return None
+            self._index = 0
+        frame = cv2.imread(self.paths[self._index])
+        self._index += 1
+        return frame
+
+
+class SyntheticSource(FrameSource):
+    # Generated frames: a fixed noise background with a bright square moving
+    # across it. Costs almost nothing to produce, so it measures the tracking
+    # pipeline itself. The same buffer is returned every read.
+    def __init__(self, width=640, height=480, fps=30.0, realtime=True, seed=0):
+        super().__init__(fps=fps, realtime=realtime)
+        rng = np.random.default_rng(seed)
+        self._background = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        self._frame = np.empty_like(self._background)
+
+    def _read_frame(self):
+        height, width = self._frame.shape[:2]
+        np.copyto(self._frame, self._background)
+        x = (self.frames_read * 8) % width
+        y = height // 2 + int(height / 4 * np.sin(self.frames_read / 15))
+        self._frame[max(0, y - 40):y + 40, max(0, x - 40):x + 40] = (180, 200, 230)
+        return self._frame
+
+
+def open_frame_source(spec, realtime=True):
+    # `spec` is a webcam index ("0"), "synthetic", a video file or a
+    # directory of images. realtime=False turns off pacing for everything
+    # except a webcam.
+    if spec.isdigit():
+        return WebcamSource(int(spec))
+    if spec == "synthetic":
+        return SyntheticSource(realtime=realtime)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, realtime=realtime)
+    return VideoFileSource(spec, realtime=realtime)
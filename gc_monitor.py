@@ -0,0 +1,91 @@
+import gc
+import sys
+import time
+import threading
+import tracemalloc
+from profiler import null_profiler
+
+
+class GCMonitor:
+    # Watches the cyclic garbage collector through gc.callbacks. Every
+    # collection is counted and timed per generation. One that runs on the
+    # thread that built the monitor is also charged to the "gc" stage of
+    # `profiler`, so collector pauses show up in the frame graphs as their
+    # own colour instead of inflating whatever stage they interrupted.
+    # end_frame() keeps the growth in allocated memory blocks per frame and,
+    # while tracemalloc is tracing, the peak bytes allocated within the frame.
+    # It is the only code that resets the tracer's peak during the game.
+    def __init__(self, profiler=null_profiler):
+        self.profiler = profiler
+        self.collections = [0, 0, 0]
+        self.pause_seconds = [0.0, 0.0, 0.0]
+        self.longest_pause = 0.0
+        self.frames = 0
+        self.frames_with_pause = 0
+        self.block_growth = 0  # Net allocated blocks summed over all frames
+        self.traced_bytes = 0
+        self.traced_frames = 0
+        self.largest_frame_bytes = 0
+        self._thread = threading.get_ident()
+        self._section = None
+        self._start = 0.0
+        self._paused = False
+        self._blocks = sys.getallocatedblocks()
+        self._frame_start_bytes = 0
+
+    def start(self):
+        gc.callbacks.append(self._callback)
+        self._begin_frame()
+
+    def stop(self):
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+            if threading.get_ident() == self._thread:
+                self._section = self.profiler.section("gc")
+                self._section.__enter__()
+            return
+        pause = time.perf_counter() - self._start
+        if self._section is not None:
+            self._section.__exit__(None, None, None)
+            self._section = None
+        generation = info["generation"]
+        self.collections[generation] += 1
+        self.pause_seconds[generation] += pause
+        self.longest_pause = max(self.longest_pause, pause)
+        self._paused = True
+
+    def _begin_frame(self):
+        self._blocks = sys.getallocatedblocks()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._frame_start_bytes = tracemalloc.get_traced_memory()[0]
+
+    def end_frame(self):
+        self.frames += 1
+        self.frames_with_pause += self._paused
+        self._paused = False
+        self.block_growth += sys.getallocatedblocks() - self._blocks
+        if tracemalloc.is_tracing():
+            allocated = tracemalloc.get_traced_memory()[1] - self._frame_start_bytes
+            self.traced_bytes += allocated
+            self.traced_frames += 1
+            self.largest_frame_bytes = max(self.largest_frame_bytes, allocated)
+        self._begin_frame()
+
+    def summary(self):
+        frames = max(self.frames, 1)
+        result = {
+            "collections": list(self.collections),
+            "pause_ms": [round(seconds * 1000, 3) for seconds in self.pause_seconds],
+            "longest_pause_ms": round(self.longest_pause * 1000, 3),
+            "frames_with_pause": self.frames_with_pause,
+            "blocks_per_frame": round(self.block_growth / frames, 2),
+        }
+        if self.traced_frames:
+            result["bytes_per_frame"] = round(self.traced_bytes / self.traced_frames)
+            result["largest_frame_bytes"] = self.largest_frame_bytes
+        return result
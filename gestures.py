@@ -0,0 +1,102 @@
+import math
+from collections import namedtuple
+import numpy as np
+from world import PlayerInput
+
+# MediaPipe hand landmark indices used by the game
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_MCP = 9
+MIDDLE_FINGER_TIP = 12
+RING_FINGER_TIP = 16
+PINKY_TIP = 20
+NUM_LANDMARKS = 21
+
+HAND_CONNECTIONS = ((0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8),
+                    (5, 9), (9, 10), (10, 11), (11, 12), (9, 13), (13, 14), (14, 15), (15, 16),
+                    (13, 17), (17, 18), (18, 19), (19, 20), (0, 17))
+
+# The four counted fingers (thumb excluded) and the middle joint of each
+finger_tips = (INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, RING_FINGER_TIP, PINKY_TIP)
+finger_joints = tuple(tip - 2 for tip in finger_tips)
+# Every landmark measure_hand() reads, gathered in one indexing operation
+_measured = np.array((WRIST, MIDDLE_FINGER_MCP) + finger_tips + finger_joints + (THUMB_TIP, INDEX_FINGER_TIP))
+
+# Distances are in palm lengths (wrist to middle knuckle), so the same
+# gesture reads the same near to and far from the camera
+pinch_press = 0.45  # Thumb tip to index tip for a pinch to start...
+pinch_release = 0.65  # ...and for it to end
+finger_margin = 0.2  # How far past its middle joint a tip must be to count with full confidence
+min_finger_confidence = 0.5
+weapon_hold_ms = 120  # A finger count must hold this long before the weapon changes
+finger_weapons = {2: "smg", 3: "machine_gun", 4: "rocket"}
+
+no_hands = np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+
+# Measurements of one hand. `pinch` is the thumb to index tip distance,
+# `extended` lists which of the four fingers are out and `finger_confidence`
+# is how clearly the least certain of them is out or curled (0 to 1).
+HandShape = namedtuple("HandShape", ["scale", "pinch", "extended", "finger_confidence"])
+
+
+def measure_hand(hand, camera_size):
+    # One vectorized pass over a (21, 3) array of normalized landmarks.
+    # x and y are scaled by `camera_size`, a float32 (width, height) array,
+    # so distances are not stretched by the frame's aspect ratio. A finger
+    # is out when its tip is further from the wrist than its middle joint,
+    # whichever way the hand is turned.
+    points = hand.take(_measured, axis=0)[:, :2]
+    points = points[1:] - points[0]
+    points *= camera_size
+    reach = np.hypot(points[:, 0], points[:, 1]).tolist()
+    pinch_x, pinch_y = (points[-2] - points[-1]).tolist()
+    scale = max(reach[0], 1e-6)
+    margins = [(tip - joint) / scale for tip, joint in zip(reach[1:5], reach[5:9])]
+    confidence = min(min(abs(margin) for margin in margins) / finger_margin, 1.0)
+    return HandShape(scale, math.hypot(pinch_x, pinch_y) / scale, [margin > 0 for margin in margins], confidence)
+
+
+class GestureRecognizer:
+    # Turns landmarks into one tick of player intent, keeping what it needs
+    # between frames. A pinch starts below pinch_press and only ends above
+    # pinch_release, so a pinch held near the threshold does not flicker. A
+    # finger count changes the weapon once it has held for weapon_hold_ms;
+    # frames where a finger is neither clearly out nor clearly curled do not
+    # count for or against it. Times are game ms, so a recorded session
+    # replays the same gestures.
+    def __init__(self, camera_width, camera_height):
+        self.camera_size = np.array([camera_width, camera_height], dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        self.pinching = False
+        self.finger_count = None  # Count currently being held
+        self._count_since = 0.0
+
+    def update(self, hands, width, height, now):
+        # `hands` is a (hands, 21, 3) array; only the first hand is used
+        if not len(hands):
+            self.reset()
+            return PlayerInput()
+        hand = hands[0]
+        shape = measure_hand(hand, self.camera_size)
+
+        index_tip = hand[INDEX_FINGER_TIP]
+        tip_x = int(index_tip[0] * width)  # Use full width
+        tip_y = int(index_tip[1] * height)  # Use full height
+        crosshair_pos = [max(10, min(width-10, tip_x)), max(10, min(height-10, tip_y))]
+        wrist = hand[WRIST]
+        move_target = [int(wrist[0] * width), int(wrist[1] * height)]  # Player walks towards the wrist
+
+        self.pinching = shape.pinch < (pinch_release if self.pinching else pinch_press)
+
+        new_weapon = None
+        if shape.finger_confidence >= min_finger_confidence:
+            count = sum(shape.extended)
+            if count != self.finger_count:
+                self.finger_count = count
+                self._count_since = now
+        if self.finger_count is not None and now - self._count_since >= weapon_hold_ms:
+            new_weapon = finger_weapons.get(self.finger_count)
+        return PlayerInput(crosshair_pos, move_target, self.pinching, new_weapon)
@@ -0,0 +1,216 @@
+import math
+import argparse
+import numpy as np
+
+filter_methods = ("none", "one_euro", "kalman")
+
+
+def _smoothing_factor(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    # One Euro filter (Casiez et al. 2012) over a whole array at once: a low
+    # pass whose cutoff rises with speed, so a still hand is smoothed hard
+    # and a moving one follows with little lag. `velocity` is the filtered
+    # derivative in units per second.
+    def __init__(self, min_cutoff=0.5, beta=40.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = None
+        self.timestamp = None
+
+    def __call__(self, x, timestamp):
+        if self.value is None:
+            self.value = x.astype(np.float64)
+            self.velocity = np.zeros_like(self.value)
+            self.timestamp = timestamp
+            return self.value
+        dt = max(timestamp - self.timestamp, 1e-6)
+        raw_velocity = (x - self.value) / dt
+        self.velocity += _smoothing_factor(self.d_cutoff, dt) * (raw_velocity - self.velocity)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        self.value += (x - self.value) / (1.0 + tau / dt)
+        self.timestamp = timestamp
+        return self.value
+
+
+class KalmanFilter:
+    # Constant-velocity Kalman filter run independently on every element of
+    # an array. `process_noise` is the acceleration noise density and
+    # `measurement_noise` the variance of one measurement.
+    def __init__(self, process_noise=0.1, measurement_noise=4e-5):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = None
+        self.timestamp = None
+
+    def __call__(self, x, timestamp):
+        if self.value is None:
+            self.value = x.astype(np.float64)
+            self.velocity = np.zeros_like(self.value)
+            self._p00 = np.full_like(self.value, self.measurement_noise)
+            self._p01 = np.zeros_like(self.value)
+            self._p11 = np.full_like(self.value, 1.0)
+            self.timestamp = timestamp
+            return self.value
+        dt = max(timestamp - self.timestamp, 1e-6)
+        q = self.process_noise
+        # Predict
+        self.value += self.velocity * dt
+        p00 = self._p00 + dt * (2 * self._p01 + dt * self._p11) + q * dt**3 / 3
+        p01 = self._p01 + dt * self._p11 + q * dt**2 / 2
+        p11 = self._p11 + q * dt
+        # Update
+        s = p00 + self.measurement_noise
+        k0 = p00 / s
+        k1 = p01 / s
+        innovation = x - self.value
+        self.value += k0 * innovation
+        self.velocity += k1 * innovation
+        self._p00 = (1 - k0) * p00
+        self._p01 = (1 - k0) * p01
+        self._p11 = p11 - k1 * p01
+        self.timestamp = timestamp
+        return self.value
+
+
+class LandmarkSmoother:
+    # Filters the (hands, 21, 3) landmark arrays of one hand-tracking stream
+    # and, with predict=True, extrapolates them at constant velocity to the
+    # time they are used. The extrapolation is capped at `max_horizon`
+    # seconds so a dropped frame cannot fling the crosshair across the screen.
+    def __init__(self, method="one_euro", predict=True, max_horizon=0.1, still_speed=0.1, **params):
+        if method not in filter_methods:
+            raise ValueError(f"unknown filter {method!r}, expected one of {filter_methods}")
+        self.method = method
+        self.predict = predict and method != "none"
+        self.max_horizon = max_horizon
+        self.still_speed = still_speed  # Speed (normalized units/s) below which prediction fades out
+        if method == "one_euro":
+            self.filter = OneEuroFilter(**params)
+        elif method == "kalman":
+            self.filter = KalmanFilter(**params)
+        else:
+            self.filter = None
+        self._timestamp = None
+
+    def reset(self):
+        if self.filter is not None:
+            self.filter.reset()
+        self._timestamp = None
+
+    def apply(self, hands, timestamp, now):
+        # `timestamp` is when `hands` was captured and `now` when the result
+        # will be used. The filter advances only when a new capture arrives.
+        if self.filter is None:
+            return hands
+        if not len(hands) or (self.filter.value is not None and self.filter.value.shape != hands.shape):
+            self.reset()
+            if not len(hands):
+                return hands
+        if timestamp != self._timestamp:
+            self.filter(hands, timestamp)
+            self._timestamp = timestamp
+        value = self.filter.value
+        if self.predict:
+            # A still hand's velocity estimate is mostly noise; scaling the
+            # lead down at low speed keeps prediction from adding jitter
+            velocity = self.filter.velocity
+            speed_squared = velocity * velocity
+            gain = speed_squared / np.maximum(speed_squared + self.still_speed ** 2, 1e-12)
+            value = value + gain * velocity * min(max(now - timestamp, 0.0), self.max_horizon)
+        return value.astype(np.float32)
+
+
+def simulate_hand(duration=20.0, rate=240.0, seed=0):
+    # Ground-truth fingertip path in normalized coordinates: holds still,
+    # then sweeps with varying speed, alternating every two seconds.
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, duration, 1 / rate)
+    path = np.zeros((len(t), 2))
+    position = np.array([0.5, 0.5])
+    segment = int(2 * rate)
+    for start in range(0, len(t), segment):
+        end = min(start + segment, len(t))
+        if (start // segment) % 2 == 0:
+            path[start:end] = position
+        else:
+            phase = (t[start:end] - t[start]) / 2.0
+            amplitude = rng.uniform(0.1, 0.3, 2)
+            frequency = rng.uniform(0.5, 1.5)
+            path[start:end] = position + amplitude * np.sin(2 * np.pi * frequency * phase)[:, None]
+            position = path[end - 1]
+    return t, path
+
+
+def evaluate(smoother, track_rate=30.0, latency=0.05, noise=0.002, render_rate=60.0, screen_width=1280, seed=0):
+    # Plays a simulated tracker (track_rate results per second, each
+    # `latency` seconds old with Gaussian noise) into `smoother` at the
+    # render rate. Returns jitter (px RMS error while the hand is settled),
+    # error (px RMS error while it moves) and lag (ms shift that best aligns
+    # the output with the true path).
+    t, truth = simulate_hand(seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    rate = 1 / (t[1] - t[0])
+    capture_times = np.arange(0, t[-1] - latency, 1 / track_rate)
+    captures = truth[(capture_times * rate).astype(int)] + rng.normal(0, noise, (len(capture_times), 2))
+    render_times = np.arange(latency + 1 / track_rate, t[-1], 1 / render_rate)
+    output = np.zeros((len(render_times), 2))
+    smoother.reset()
+    for i, now in enumerate(render_times):
+        latest = np.searchsorted(capture_times + latency, now, side="right") - 1
+        hand = np.zeros((1, 21, 3), dtype=np.float32)
+        hand[0, :, :2] = captures[latest]
+        output[i] = smoother.apply(hand, capture_times[latest], now)[0, 0, :2]
+    expected = truth[(render_times * rate).astype(int)]
+    moving = np.any(np.abs(np.gradient(expected, axis=0)) > 1e-9, axis=1)
+    # Still means the hand has not moved for half a second, so the tail of
+    # a movement counts towards lag rather than jitter
+    settled = np.convolve(moving, np.ones(int(0.5 * render_rate)), mode="full")[:len(moving)] == 0
+    error = np.hypot(*(output - expected).T) * screen_width
+    shifts = np.arange(0, int(0.2 * rate))
+    shift_error = [np.mean(np.hypot(*(output[moving] - truth[np.maximum((render_times[moving] * rate).astype(int) - s, 0)]).T))
+                   for s in shifts]
+    return {
+        "jitter_px": float(np.sqrt(np.mean(error[settled] ** 2))),
+        "error_px": float(np.sqrt(np.mean(error[moving] ** 2))),
+        "lag_ms": float(shifts[int(np.argmin(shift_error))] / rate * 1000),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure landmark filter jitter and lag on a simulated hand")
+    parser.add_argument("--track-rate", type=float, default=30.0, help="hand-tracking results per second")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds from capture to result")
+    parser.add_argument("--noise", type=float, default=0.002, help="landmark noise, normalized units")
+    parser.add_argument("--min-cutoff", type=float, default=0.5)
+    parser.add_argument("--beta", type=float, default=40.0)
+    parser.add_argument("--process-noise", type=float, default=0.1)
+    parser.add_argument("--measurement-noise", type=float, default=4e-5)
+    parser.add_argument("--still-speed", type=float, default=0.1)
+    args = parser.parse_args()
+    one_euro = {"min_cutoff": args.min_cutoff, "beta": args.beta}
+    kalman = {"process_noise": args.process_noise, "measurement_noise": args.measurement_noise}
+    configurations = [
+        ("raw", LandmarkSmoother("none")),
+        ("one_euro", LandmarkSmoother("one_euro", predict=False, **one_euro)),
+        ("one_euro+predict", LandmarkSmoother("one_euro", still_speed=args.still_speed, **one_euro)),
+        ("kalman", LandmarkSmoother("kalman", predict=False, **kalman)),
+        ("kalman+predict", LandmarkSmoother("kalman", still_speed=args.still_speed, **kalman)),
+    ]
+    print(f"{'filter':18}{'jitter px':>10}{'error px':>10}{'lag ms':>8}")
+    for name, smoother in configurations:
+        result = evaluate(smoother, args.track_rate, args.latency, args.noise)
+        print(f"{name:18}{result['jitter_px']:10.2f}{result['error_px']:10.2f}{result['lag_ms']:8.0f}")
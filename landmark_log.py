@@ -0,0 +1,116 @@
+import random
+import time
+import argparse
+import numpy as np
+from gestures import NUM_LANDMARKS, GestureRecognizer, no_hands
+from world import World, tick_ms
+
+# A landmark log is one header record followed by fixed-size frame records,
+# so a finished file can be memory-mapped as a single record array. Frames
+# are written only when the hands, the flags or the gesture decisions
+# (shoot, weapon) change; the decisions depend on how long a gesture has
+# been held, so they can change while the hands stay the same. `time` is
+# the world clock (ms) before that frame's simulation steps.
+log_magic = b"ZLMK"
+log_version = 1
+
+RESET = 1  # Space was pressed this frame
+END = 2  # Last record, written when the session closes
+
+header_dtype = np.dtype([("magic", "S4"), ("version", np.uint8), ("max_hands", np.uint8), ("seed", np.int64),
+                         ("width", np.int32), ("height", np.int32), ("camera_width", np.int32), ("camera_height", np.int32)])
+
+
+def record_dtype(max_hands):
+    return np.dtype([("time", np.float64), ("flags", np.uint8), ("hands", np.uint8),
+                     ("landmarks", np.float32, (max_hands, NUM_LANDMARKS, 3))])
+
+
+class LandmarkRecorder:
+    def __init__(self, path, seed, width, height, camera_width, camera_height, max_hands):
+        self.dtype = record_dtype(max_hands)
+        self.max_hands = max_hands
+        self.records_written = 0
+        self._record = np.zeros(1, dtype=self.dtype)
+        self._last_hands = None
+        self._last_decision = None
+        self._file = open(path, "wb")
+        header = np.array([(log_magic, log_version, max_hands, seed, width, height, camera_width, camera_height)],
+                          dtype=header_dtype)
+        self._file.write(header.tobytes())
+
+    def write(self, now, hands, flags=0, inputs=None):
+        # `inputs` is the PlayerInput the recognizer made of `hands`
+        decision = None if inputs is None else (inputs.shoot, inputs.weapon)
+        if (not flags and self._last_hands is not None and np.array_equal(hands, self._last_hands)
+                and decision == self._last_decision):
+            return
+        record = self._record[0]
+        record["time"] = now
+        record["flags"] = flags
+        record["hands"] = len(hands)
+        record["landmarks"][:len(hands)] = hands
+        record["landmarks"][len(hands):] = 0
+        self._file.write(self._record.tobytes())
+        self._last_hands = hands.copy()
+        self._last_decision = decision
+        self.records_written += 1
+
+    def close(self, now):
+        self.write(now, no_hands, END)
+        self._file.close()
+
+
+class LandmarkReplay:
+    # Read-only view of a landmark log. Records are memory-mapped, so
+    # opening a long session costs nothing until it is played.
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=header_dtype, count=1)
+        if not len(header) or header["magic"][0] != log_magic or header["version"][0] != log_version:
+            raise ValueError(f"{path} is not a version {log_version} landmark log")
+        header = header[0]
+        self.seed = int(header["seed"])
+        self.width = int(header["width"])
+        self.height = int(header["height"])
+        self.camera_width = int(header["camera_width"])
+        self.camera_height = int(header["camera_height"])
+        self.records = np.memmap(path, dtype=record_dtype(int(header["max_hands"])), mode="r",
+                                 offset=header_dtype.itemsize)
+
+    def __len__(self):
+        return len(self.records)
+
+    def play(self, world=None):
+        # Re-runs the session on a world seeded like the original one and
+        # returns it. Every frame's input is applied to the steps that frame
+        # took, which reproduces the recorded game exactly.
+        if world is None:
+            world = World(self.width, self.height, rng=random.Random(self.seed))
+        records = self.records
+        times = records["time"]
+        recognizer = GestureRecognizer(self.camera_width, self.camera_height)
+        for i in range(len(records)):
+            record = records[i]
+            if record["flags"] & END:
+                break
+            if record["flags"] & RESET and world.state in ["menu", "game_over"]:
+                world.reset()
+            inputs = recognizer.update(record["landmarks"][:record["hands"]], self.width, self.height, times[i])
+            end = times[i + 1] if i + 1 < len(records) else times[i] + tick_ms
+            while world.clock.now() < end:
+                world.step(tick_ms, inputs)
+                world.events.clear()
+        return world
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded landmark log headless")
+    parser.add_argument("path")
+    args = parser.parse_args()
+    replay = LandmarkReplay(args.path)
+    start = time.perf_counter()
+    world = replay.play()
+    elapsed = time.perf_counter() - start
+    game_time = world.clock.now() / 1000
+    print(f"{len(replay)} records, {game_time:.1f}s of play replayed in {elapsed:.2f}s ({game_time / elapsed:.0f}x real time)")
+    print(f"state {world.state}, wave {world.wave_number}, score {world.score}, high score {world.high_score}")
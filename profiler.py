@@ -0,0 +1,216 @@
+import csv
+import json
+import time
+import numpy as np
+import pygame
+
+
+class _Section:
+    # Context manager for one stage. Time spent in a nested section is
+    # charged to the inner stage only, so the stages of a frame add up to the
+    # frame's total time.
+    __slots__ = ("profiler", "index", "start", "began")
+
+    def __init__(self, profiler, index):
+        self.profiler = profiler
+        self.index = index
+        self.start = 0.0
+        self.began = 0.0
+
+    def __enter__(self):
+        open_sections = self.profiler._open
+        now = time.perf_counter()
+        if open_sections:
+            parent = open_sections[-1]
+            self.profiler._current[parent.index] += now - parent.start
+        open_sections.append(self)
+        self.start = now
+        self.began = now
+
+    def __exit__(self, *exc):
+        profiler = self.profiler
+        open_sections = profiler._open
+        now = time.perf_counter()
+        profiler._current[self.index] += now - self.start
+        profiler._record_event(self.index, self.began, now)
+        open_sections.pop()
+        if open_sections:
+            open_sections[-1].start = now
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_null_section = _NullSection()
+
+
+class FrameProfiler:
+    # Seconds spent in each named stage, one row per frame, kept in a ring
+    # buffer of the last `frames` frames. Every section is also kept as a
+    # (stage, start, end) event in a second ring for trace export. Sections
+    # and rings are allocated up front; when disabled, section() hands back a
+    # shared do-nothing object.
+    def __init__(self, stages, frames=600, enabled=True, name="main", events_per_frame=16):
+        self.stages = tuple(stages)
+        self.enabled = enabled
+        self.name = name
+        self.times = np.zeros((frames, len(self.stages)), dtype=np.float64)
+        self.frame_count = 0  # Frames ended so far, including ones overwritten in the ring
+        self.event_stage = np.zeros(frames * events_per_frame, dtype=np.int16)
+        self.event_span = np.zeros((frames * events_per_frame, 2), dtype=np.float64)
+        self.event_count = 0
+        self._sections = {name: _Section(self, i) for i, name in enumerate(self.stages)}
+        self._current = np.zeros(len(self.stages), dtype=np.float64)
+        self._open = []
+
+    def _record_event(self, index, start, end):
+        i = self.event_count % len(self.event_stage)
+        self.event_stage[i] = index
+        self.event_span[i] = (start, end)
+        self.event_count += 1
+
+    def section(self, name):
+        if not self.enabled:
+            return _null_section
+        return self._sections[name]
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.times[self.frame_count % len(self.times)] = self._current
+        self._current[:] = 0
+        self.frame_count += 1
+
+    def clear(self):
+        self.times[:] = 0
+        self._current[:] = 0
+        self.frame_count = 0
+        self.event_count = 0
+
+    def history(self):
+        # Rows for the frames still in the ring, oldest first
+        return _ring_order(self.times, self.frame_count)
+
+    def events(self):
+        # (stage index, start, end) of the sections still in the ring, oldest first
+        return _ring_order(self.event_stage, self.event_count), _ring_order(self.event_span, self.event_count)
+
+    def means(self, frames=60):
+        # Mean ms per stage over the last `frames` frames
+        history = self.history()[-frames:]
+        if not len(history):
+            return np.zeros(len(self.stages))
+        return history.mean(axis=0) * 1000
+
+    def write_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{stage}_ms" for stage in self.stages] + ["total_ms"])
+            history = self.history()
+            first = self.frame_count - len(history)
+            for i, row in enumerate(history * 1000):
+                writer.writerow([first + i] + [f"{value:.4f}" for value in row] + [f"{row.sum():.4f}"])
+
+
+def _ring_order(ring, count):
+    if count <= len(ring):
+        return ring[:count]
+    start = count % len(ring)
+    return np.concatenate([ring[start:], ring[:start]])
+
+
+def write_chrome_trace(path, profilers):
+    # Trace Event Format JSON, one thread per profiler. Open it in
+    # chrome://tracing or https://ui.perfetto.dev.
+    trace = []
+    for tid, profiler in enumerate(profilers, 1):
+        trace.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": profiler.name}})
+        stages, spans = profiler.events()
+        for stage, (start, end) in zip(stages.tolist(), spans.tolist()):
+            trace.append({"name": profiler.stages[stage], "ph": "X", "pid": 1, "tid": tid,
+                          "ts": start * 1e6, "dur": (end - start) * 1e6})
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+null_profiler = FrameProfiler((), frames=1, enabled=False)
+
+
+stage_colors = [(66, 133, 244), (219, 68, 55), (244, 180, 0), (15, 157, 88), (171, 71, 188),
+                (0, 172, 193), (255, 112, 67), (158, 157, 36), (92, 107, 192)]
+
+
+class ProfilerOverlay:
+    # Rolling stacked graph of the last `graph_width` frames, one colour per
+    # stage, with a legend of recent averages. The graph is filled as a pixel
+    # array in one pass; the legend is re-rendered only every
+    # `legend_interval` frames so the text changes at a readable rate. Its
+    # numbers change too often to go through the text cache.
+    graph_width = 300
+    graph_height = 100
+    scale_ms = 33.3  # Frame time at the top of the graph
+    legend_interval = 30
+
+    def __init__(self, profiler, font, others=()):
+        self.profiler = profiler
+        self.font = font
+        self.others = others  # Profilers of other threads, listed by average only
+        line_height = font.get_linesize()
+        legend_lines = len(profiler.stages) + len(others)
+        self.surface = pygame.Surface((self.graph_width, self.graph_height + 4 + legend_lines * line_height))
+        self._graph = pygame.Surface((self.graph_width, self.graph_height))
+        self._pixels = np.zeros((self.graph_width, self.graph_height, 3), dtype=np.uint8)
+        self._height_from_bottom = np.arange(self.graph_height - 1, -1, -1)
+        self._colors = np.array([stage_colors[i % len(stage_colors)] for i in range(len(profiler.stages))], dtype=np.uint8)
+        self._line_height = line_height
+        self._frames_since_legend = self.legend_interval
+
+    def _draw_graph(self):
+        history = self.profiler.history()[-self.graph_width:]
+        pixels = self._pixels
+        pixels[:] = 0
+        if len(history):
+            top = np.minimum(np.cumsum(history * 1000, axis=1) * (self.graph_height / self.scale_ms), self.graph_height)
+            columns = pixels[self.graph_width - len(history):]
+            lower = np.zeros(len(history))
+            for stage, color in enumerate(self._colors):
+                upper = top[:, stage]
+                mask = ((self._height_from_bottom[None, :] >= lower[:, None]) &
+                        (self._height_from_bottom[None, :] < upper[:, None]))
+                columns[mask] = color
+                lower = upper
+        pygame.surfarray.blit_array(self._graph, pixels)
+        budget_y = self.graph_height - 1 - int(1000 / 60 * self.graph_height / self.scale_ms)
+        pygame.draw.line(self._graph, (128, 128, 128), (0, budget_y), (self.graph_width, budget_y))
+        self.surface.blit(self._graph, (0, 0))
+
+    def _draw_legend(self):
+        y = self.graph_height + 4
+        self.surface.fill((0, 0, 0), (0, y, self.surface.get_width(), self.surface.get_height() - y))
+        means = self.profiler.means()
+        for stage, mean in enumerate(means):
+            color = tuple(int(c) for c in self._colors[stage])
+            self.surface.fill(color, (0, y + 3, 8, 8))
+            self.surface.blit(self.font.render(self.profiler.stages[stage], True, color), (12, y))
+            value = self.font.render(f"{mean:.2f} ms", True, color)
+            self.surface.blit(value, (150 - value.get_width(), y))
+            y += self._line_height
+        for other in self.others:
+            text = "  ".join(f"{name} {mean:.1f}" for name, mean in zip(other.stages, other.means()))
+            self.surface.blit(self.font.render(f"{other.name}: {text} ms", True, (200, 200, 200)), (0, y))
+            y += self._line_height
+
+    def draw(self, window, pos):
+        self._draw_graph()
+        self._frames_since_legend += 1
+        if self._frames_since_legend >= self.legend_interval:
+            self._draw_legend()
+            self._frames_since_legend = 0
+        window.blit(self.surface, pos)
@@ -0,0 +1,74 @@
+import math
+import numpy as np
+
+WEAPON_TYPES = ("pistol", "smg", "machine_gun", "rocket", "flamethrower")
+PISTOL, SMG, MACHINE_GUN, ROCKET, FLAMETHROWER = range(len(WEAPON_TYPES))
+
+
+class ProjectilePool:
+    # Fixed-capacity projectile storage. Live projectiles are the rows with
+    # active set; freed rows go back on a free list and are reused by spawn().
+    def __init__(self, width, height, capacity=1024):
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), dtype=np.float64)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float64)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.weapon = np.zeros(capacity, dtype=np.int8)
+        self.active = np.zeros(capacity, dtype=bool)
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return self.capacity - len(self._free)
+
+    def clear(self):
+        self.active[:] = False
+        self._free = list(range(self.capacity - 1, -1, -1))
+
+    def spawn(self, x, y, target_x, target_y, weapon, speed, size, life, damage):
+        # Returns the row used, or -1 when the pool is full
+        if not self._free:
+            return -1
+        i = self._free.pop()
+        dx = target_x - x
+        dy = target_y - y
+        dist = max(1, math.hypot(dx, dy))
+        self.pos[i] = (x, y)
+        self.velocity[i] = (dx/dist * speed, dy/dist * speed)
+        self.life[i] = life
+        self.damage[i] = damage
+        self.size[i] = size
+        self.weapon[i] = weapon
+        self.active[i] = True
+        return i
+
+    def release(self, indices):
+        for i in indices:
+            if self.active[i]:
+                self.active[i] = False
+                self._free.append(int(i))
+
+    def active_indices(self):
+        return np.flatnonzero(self.active)
+
+    def step(self, obstacles, obstacle_half, indices=None):
+        # Moves every live projectile (or just `indices`) one tick and returns
+        # the rows that expired, left the screen or ended inside an obstacle
+        # AABB. The caller handles them and then calls release().
+        if indices is None:
+            indices = self.active_indices()
+        if len(indices) == 0:
+            return indices
+        self.pos[indices] += self.velocity[indices]
+        self.life[indices] -= 1
+        pos = self.pos[indices]
+        culled = ((self.life[indices] <= 0) |
+                  (pos[:, 0] < 0) | (pos[:, 0] > self.width) |
+                  (pos[:, 1] < 0) | (pos[:, 1] > self.height))
+        if len(obstacles):
+            offset = np.abs(pos[:, None, :] - obstacles[None, :, :])
+            culled |= np.any((offset[:, :, 0] < obstacle_half) & (offset[:, :, 1] < obstacle_half), axis=1)
+        return indices[culled]
@@ -0,0 +1,94 @@
+from collections import namedtuple, deque
+
+# One step of the quality ladder:
+# - preview: whether the camera inset is shown at all
+# - preview_interval: convert every nth new camera frame for the inset
+# - landmarks: draw the hand skeleton onto the preview
+# - max_explosions: newest explosions drawn (None for all)
+# - flame_step: draw every nth flamethrower particle
+# - text_interval: re-render the HUD text every nth frame
+# - tracking_interval: run hand tracking on every nth captured frame
+QualityLevel = namedtuple("QualityLevel", ["name", "preview", "preview_interval", "landmarks", "max_explosions",
+                                           "flame_step", "text_interval", "tracking_interval"])
+
+# From full quality down; each level keeps what the ones above it shed
+quality_levels = (
+    QualityLevel("full", True, 1, True, None, 1, 1, 1),
+    QualityLevel("preview at half rate", True, 2, True, None, 1, 1, 1),
+    QualityLevel("no landmarks", True, 2, False, None, 1, 1, 1),
+    QualityLevel("light effects", True, 2, False, 16, 2, 1, 1),
+    QualityLevel("slow text", True, 2, False, 16, 2, 6, 1),
+    QualityLevel("slow tracking", True, 3, False, 16, 2, 6, 2),
+    QualityLevel("minimal", False, 3, False, 8, 3, 6, 2),
+)
+
+
+class QualityGovernor:
+    # Holds the frame budget by moving along quality_levels. frame() is
+    # given the time each frame spent working (not waiting for the next
+    # tick). When the mean of the last `window` frames is over budget the
+    # level drops one step; once every frame of the last `recover_frames`
+    # has stayed under `headroom` of the budget it rises one step. After a
+    # change the governor waits `settle_frames` before judging again, so
+    # what it measures is the new level. Callables in `hooks` are called
+    # as hook(governor, previous_index) on every change.
+    def __init__(self, budget_ms=1000 / 60, levels=quality_levels, window=30, headroom=0.7,
+                 recover_frames=180, settle_frames=60):
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.window = window
+        self.headroom = headroom
+        self.recover_frames = recover_frames
+        self.settle_frames = settle_frames
+        self.index = 0
+        self.frames = 0
+        self.hooks = []
+        self.history = []  # (frame, level index, mean ms of the window that triggered it)
+        self.frames_at_level = [0] * len(levels)
+        self._recent = deque(maxlen=window)
+        self._total = 0.0
+        self._calm = 0  # Consecutive frames under the headroom line
+        self._settle = 0
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def frame(self, frame_ms):
+        # Returns True when the level changed
+        self.frames += 1
+        self.frames_at_level[self.index] += 1
+        if len(self._recent) == self.window:
+            self._total -= self._recent[0]
+        self._recent.append(frame_ms)
+        self._total += frame_ms
+        self._calm = self._calm + 1 if frame_ms < self.headroom * self.budget_ms else 0
+        if self._settle:
+            self._settle -= 1
+            return False
+        mean = self._total / len(self._recent)
+        if len(self._recent) == self.window and mean > self.budget_ms and self.index < len(self.levels) - 1:
+            return self._change(self.index + 1, mean)
+        if self._calm >= self.recover_frames and self.index > 0:
+            return self._change(self.index - 1, mean)
+        return False
+
+    def _change(self, index, mean):
+        previous, self.index = self.index, index
+        self.history.append((self.frames, index, round(mean, 2)))
+        self._recent.clear()
+        self._total = 0.0
+        self._calm = 0
+        self._settle = self.settle_frames
+        for hook in self.hooks:
+            hook(self, previous)
+        return True
+
+    def metrics(self):
+        return {
+            "level": self.index,
+            "name": self.level.name,
+            "changes": len(self.history),
+            "history": list(self.history),
+            "frames_at_level": {level.name: frames for level, frames in zip(self.levels, self.frames_at_level)},
+        }
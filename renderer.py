@@ -0,0 +1,109 @@
+import pygame
+
+DEBUG_COLOR = (255, 0, 255)
+
+
+class DirtyRenderer:
+    # Stands in for the display surface. Every blit is recorded, and each
+    # frame only the areas drawn this frame or the previous one are erased
+    # and pushed with display.update(rects). Layers (the camera inset) are
+    # part of the background: erasing restores them, and they are only
+    # re-blitted when their surface changes. A frame that drew over more
+    # than `full_redraw_ratio` of the screen, or in more than
+    # `full_redraw_rects` rectangles, is followed by a whole-screen clear
+    # and push, which is cheaper than erasing that many rectangles one by one.
+    def __init__(self, surface, background, full_redraw_ratio=0.4, full_redraw_rects=200):
+        self.surface = surface
+        self.background = background
+        self.full_redraw_ratio = full_redraw_ratio
+        self.full_redraw_rects = full_redraw_rects
+        self.screen_area = surface.get_width() * surface.get_height()
+        self.show_dirty = False
+        self.full_redraws = 0
+        self.partial_updates = 0
+        self._layers = {}
+        self._previous = []
+        self._current = []
+        self._layer_updates = []
+        self._full = True
+
+    def invalidate(self):
+        # Clear and push the whole screen on the next frame
+        self._full = True
+
+    def _restore(self, rect):
+        self.surface.fill(self.background, rect)
+        for layer_surface, layer_rect in self._layers.values():
+            overlap = rect.clip(layer_rect)
+            if overlap:
+                self.surface.blit(layer_surface, overlap.topleft, overlap.move(-layer_rect.x, -layer_rect.y))
+
+    def begin_frame(self):
+        if self._full:
+            self._restore(self.surface.get_rect())
+        else:
+            for rect in self._previous:
+                self._restore(rect)
+
+    def set_layer(self, key, layer_surface, dest):
+        old = self._layers.get(key)
+        if layer_surface is None:
+            if old is not None:
+                del self._layers[key]
+                self._restore(old[1])
+                self._layer_updates.append(old[1])
+            return
+        rect = pygame.Rect(dest, layer_surface.get_size())
+        if old is not None and old[1] != rect:
+            del self._layers[key]
+            self._restore(old[1])
+            self._layer_updates.append(old[1])
+            old = None
+        if old is None or old[0] is not layer_surface:
+            self.surface.blit(layer_surface, rect)
+            self._layer_updates.append(rect)
+        self._layers[key] = (layer_surface, rect)
+
+    def layer_changed(self, key):
+        # The layer's surface was drawn into in place; show the new contents
+        layer = self._layers.get(key)
+        if layer is not None:
+            self.surface.blit(*layer)
+            self._layer_updates.append(layer[1])
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = self.surface.blit(source, dest, area, special_flags)
+        self._current.append(rect)
+        return rect
+
+    def blits(self, blit_sequence, doreturn=True):
+        rects = self.surface.blits(blit_sequence, doreturn=True)
+        self._current.extend(rects)
+        return rects if doreturn else None
+
+    def line(self, color, start_pos, end_pos, width=1):
+        rect = pygame.draw.line(self.surface, color, start_pos, end_pos, width)
+        self._current.append(rect)
+        return rect
+
+    def rect(self, color, rect, width=0):
+        rect = pygame.draw.rect(self.surface, color, rect, width)
+        self._current.append(rect)
+        return rect
+
+    def present(self):
+        if self.show_dirty:
+            for rect in self._current:
+                pygame.draw.rect(self.surface, DEBUG_COLOR, rect, 1)
+        dirty = self._previous + self._current + self._layer_updates
+        if self._full or sum(rect.w * rect.h for rect in dirty) > self.full_redraw_ratio * self.screen_area:
+            pygame.display.update()
+            self.full_redraws += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_updates += 1
+        self._previous = self._current
+        self._current = []
+        self._layer_updates = []
+        self._full = (len(self._previous) > self.full_redraw_rects or
+                      sum(rect.w * rect.h for rect in self._previous) > self.full_redraw_ratio * self.screen_area)
@@ -0,0 +1,62 @@
+import heapq
+
+
+class Timer:
+    __slots__ = ("due", "interval", "callback", "args", "cancelled")
+
+    def __init__(self, due, interval, callback, args):
+        self.due = due
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class Scheduler:
+    # One-shot and repeating timers in game time (ms), kept on a binary heap
+    # ordered by due time, so run() only touches timers that are due. Timers
+    # due at the same time fire in the order they were scheduled. A callback
+    # is called as callback(now, *args) and may return a time to run again
+    # at; otherwise a repeating timer comes back `interval` ms after it was
+    # due and a one-shot timer is dropped. Cancelled timers are skipped when
+    # they reach the top of the heap.
+    def __init__(self):
+        self._heap = []
+        self._sequence = 0
+        self.fired = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _push(self, timer):
+        heapq.heappush(self._heap, (timer.due, self._sequence, timer))
+        self._sequence += 1
+
+    def schedule(self, due, callback, *args, interval=None):
+        timer = Timer(due, interval, callback, args)
+        self._push(timer)
+        return timer
+
+    def clear(self):
+        self._heap.clear()
+
+    def cancel(self, timer):
+        timer.cancelled = True
+
+    def run(self, now):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)[2]
+            if timer.cancelled:
+                continue
+            again = timer.callback(now, *timer.args)
+            self.fired += 1
+            if timer.cancelled:
+                continue
+            if again is not None:
+                timer.due = again
+            elif timer.interval is not None:
+                timer.due += timer.interval
+            else:
+                continue
+            self._push(timer)
@@ -0,0 +1,88 @@
+import numpy as np
+
+_OFFSET = 1 << 20  # Keeps cell coordinates of off-screen entities positive
+_STRIDE = 1 << 21
+
+
+class SpatialHash:
+    # Uniform grid broad phase. Every entity is filed under the cell holding
+    # its centre, and queries widen their search box by the largest extent
+    # that was inserted, so anything whose circle or AABB could reach the
+    # query area is returned. Candidates come back as ascending indices into
+    # the arrays passed to build(), which keeps results in the same order a
+    # brute-force scan would visit them.
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.count = 0
+        self.max_extent = 0.0
+        self._order = np.empty(0, dtype=np.intp)
+        self._keys = np.empty(0, dtype=np.int64)
+
+    def _key(self, cx, cy):
+        return (cx + _OFFSET) * _STRIDE + (cy + _OFFSET)
+
+    def build(self, positions, extents):
+        # `extents` is the radius of a circle or the half-size of an AABB
+        self.count = len(positions)
+        if self.count == 0:
+            self.max_extent = 0.0
+            self._order = np.empty(0, dtype=np.intp)
+            self._keys = np.empty(0, dtype=np.int64)
+            return
+        cells = np.floor_divide(positions, self.cell_size).astype(np.int64)
+        keys = self._key(cells[:, 0], cells[:, 1])
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+        self.max_extent = float(np.max(extents))
+
+    def query(self, x, y, extent=0):
+        if self.count == 0:
+            return self._order
+        reach = extent + self.max_extent
+        cx0, cx1 = int((x - reach) // self.cell_size), int((x + reach) // self.cell_size)
+        cy0, cy1 = int((y - reach) // self.cell_size), int((y + reach) // self.cell_size)
+        # For a fixed column the keys of cy0..cy1 are contiguous in sorted order
+        columns = np.arange(cx0, cx1 + 1, dtype=np.int64)
+        starts = np.searchsorted(self._keys, self._key(columns, cy0), side="left")
+        ends = np.searchsorted(self._keys, self._key(columns, cy1), side="right")
+        if len(columns) == 1:
+            candidates = self._order[starts[0]:ends[0]]
+        else:
+            candidates = np.concatenate([self._order[s:e] for s, e in zip(starts, ends)])
+        return np.sort(candidates)
+
+
+class BruteForceIndex:
+    # Same interface as SpatialHash but every entity is a candidate. Used as
+    # the reference when checking the grid against the old all-pairs scans.
+    def __init__(self, cell_size=None):
+        self.count = 0
+
+    def build(self, positions, extents):
+        self.count = len(positions)
+
+    def query(self, x, y, extent=0):
+        return np.arange(self.count)
+
+
+def _object_arrays(objects):
+    positions = np.array([obj.pos for obj in objects], dtype=np.float64).reshape(-1, 2)
+    extents = np.array([obj.size / 2 for obj in objects], dtype=np.float64)
+    return positions, extents
+
+
+class CollisionGrid:
+    # One broad phase per entity layer, rebuilt once per tick and shared by
+    # every check_* function.
+    def __init__(self, cell_size=128, index_type=SpatialHash):
+        self.zombies = index_type(cell_size)
+        self.barricades = index_type(cell_size)
+        self.pickups = index_type(cell_size)
+        self.barricade_positions = np.empty((0, 2), dtype=np.float64)
+
+    def build(self, zombies, barricades, pickups):
+        n = zombies.count
+        self.zombies.build(zombies.pos[:n], zombies.size[:n] / 2)
+        self.barricade_positions, extents = _object_arrays(barricades)
+        self.barricades.build(self.barricade_positions, extents)
+        self.pickups.build(*_object_arrays(pickups))
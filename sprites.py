@@ -0,0 +1,37 @@
+import pygame
+
+COLORKEY = (255, 0, 255)
+
+
+class SpriteCache:
+    # Rasterizes each distinct look once. `key` must capture everything the
+    # picture depends on (size, colour, flash state...). Builders return a
+    # surface from new_surface() plus the offset from the entity's position
+    # to the sprite's top-left corner.
+    def __init__(self):
+        self._sprites = {}
+
+    def __len__(self):
+        return len(self._sprites)
+
+    @staticmethod
+    def new_surface(width, height):
+        surface = pygame.Surface((width, height))
+        surface.fill(COLORKEY)
+        surface.set_colorkey(COLORKEY)
+        return surface
+
+    def get(self, key, build, *args):
+        entry = self._sprites.get(key)
+        if entry is None:
+            surface, offset = build(*args)
+            entry = (surface.convert(), offset)
+            self._sprites[key] = entry
+        return entry
+
+    def clear(self):
+        self._sprites.clear()
+
+    def memory_bytes(self):
+        return sum(surface.get_bytesize() * surface.get_width() * surface.get_height()
+                   for surface, _ in self._sprites.values())
@@ -0,0 +1,87 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+
+class StagedStartup:
+    # Start-up split into named, timed stages. The stages handed to start()
+    # run one after another on a background thread, so the window can show
+    # the menu and a progress bar while the camera opens and the hand model
+    # loads. A stage is called with the results of the stages before it (a
+    # dict keyed by stage name) and its return value is stored under its own
+    # name. Work done on the main thread is timed with stage() or record().
+    # Every stage and milestone is logged with its duration and the time
+    # since `origin`, the perf_counter() value the process started at.
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.timings = []  # (stage, seconds) in the order they finished
+        self.milestones = {}  # name: seconds since origin
+        self.results = {}
+        self.total = 0
+        self.completed = 0
+        self.current = None  # Stage running on the background thread
+        self.error = None
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    def since_origin(self):
+        return time.perf_counter() - self.origin
+
+    def record(self, name, start):
+        # Log a stage that began at perf_counter() value `start` and ends now
+        seconds = time.perf_counter() - start
+        self.timings.append((name, seconds))
+        logging.info(f"Startup: {name} took {seconds * 1000:.0f} ms ({self.since_origin() * 1000:.0f} ms since launch)")
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        yield
+        self.record(name, start)
+
+    def milestone(self, name):
+        if name not in self.milestones:
+            self.milestones[name] = self.since_origin()
+            logging.info(f"Startup: {name} after {self.milestones[name] * 1000:.0f} ms")
+
+    def start(self, stages):
+        stages = list(stages)
+        self.total = len(stages)
+        self._thread = threading.Thread(target=self._run, args=(stages,), name="startup", daemon=True)
+        self._thread.start()
+
+    def _run(self, stages):
+        for name, function in stages:
+            if self._cancelled.is_set():
+                break
+            self.current = name
+            start = time.perf_counter()
+            try:
+                self.results[name] = function(self.results)
+            except Exception as e:
+                self.error = e
+                logging.error(f"Startup failed at {name}: {e}")
+                break
+            self.record(name, start)
+            self.completed += 1
+        self.current = None
+
+    @property
+    def ready(self):
+        return self.total > 0 and self.completed == self.total
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    def progress(self):
+        # Fraction of the background stages finished
+        return self.completed / self.total if self.total else 0.0
+
+    def cancel(self, timeout=None):
+        # Skip the stages not yet begun and wait for the running one, after
+        # which results holds everything that was built
+        self._cancelled.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
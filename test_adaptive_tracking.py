@@ -0,0 +1,71 @@
+import numpy as np
+from adaptive_tracking import AdaptiveTracking, full_frame_plan
+
+frame_width, frame_height = 320, 240
+
+
+def hand_at(cx, cy, side=60):
+    # 21 landmarks spread over a side x side pixel box centred on (cx, cy)
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-0.5, 0.5, (21, 3)) * side
+    points[0, :2] = (-side / 2, -side / 2)
+    points[1, :2] = (side / 2, side / 2)
+    hand = np.empty((1, 21, 3), dtype=np.float32)
+    hand[0, :, 0] = (cx + points[:, 0]) / frame_width
+    hand[0, :, 1] = (cy + points[:, 1]) / frame_height
+    hand[0, :, 2] = 0
+    return hand
+
+
+def test_lost_crop_skip_lost():
+    tracking = AdaptiveTracking(frame_width, frame_height)
+    frame = np.zeros((frame_height, frame_width, 3), dtype=np.uint8)
+
+    # Nothing known: the whole frame
+    plan = tracking.plan(frame, 0.0)
+    assert plan == full_frame_plan
+    tracking.observe(plan, hand_at(160, 120), 0.0, frame)
+
+    # Hand found: a crop around it, which stays put while the hand moves a little
+    plan = tracking.plan(frame, 0.033)
+    assert not plan.skip and plan.roi is not None and plan.size is not None
+    x0, y0, x1, y1 = plan.roi
+    assert x0 <= 130 and x1 >= 190 and y0 <= 90 and y1 >= 150
+    first = plan
+    tracking.observe(plan, hand_at(163, 121), 0.033, frame)
+    plan = tracking.plan(frame, 0.066)
+    assert (plan.roi, plan.size) == (first.roi, first.size)
+    tracking.observe(plan, hand_at(163, 121), 0.066, frame)
+    assert tracking.regions == 1
+
+    # Still hand in an unchanged region: inference is skipped up to max_skip times
+    for i in range(tracking.max_skip):
+        plan = tracking.plan(frame, 0.1 + i * 0.033)
+        assert plan.skip and plan.landmarks.shape == (1, 21, 3)
+        tracking.observe(plan, plan.landmarks, 0.1 + i * 0.033, frame)
+    plan = tracking.plan(frame, 0.2)
+    assert not plan.skip and plan.roi == first.roi
+
+    # The hand moves out of the region: it is placed again around the hand
+    tracking.observe(plan, hand_at(60, 60), 0.2, frame)
+    assert tracking.regions == 2
+    plan = tracking.plan(frame, 0.233)
+    assert not plan.skip and plan.roi != first.roi
+    x0, y0, x1, y1 = plan.roi
+    assert x0 <= 30 and x1 >= 90 and y0 <= 30 and y1 >= 90
+
+    # Lost again: back to whole frames
+    tracking.observe(plan, np.empty((0, 21, 3), dtype=np.float32), 0.266, frame)
+    assert tracking.plan(frame, 0.3) == full_frame_plan
+    assert (tracking.frames_full, tracking.frames_skipped) == (2, tracking.max_skip)
+
+
+def test_region_is_replaced_when_the_hand_shrinks():
+    tracking = AdaptiveTracking(frame_width, frame_height)
+    frame = np.zeros((frame_height, frame_width, 3), dtype=np.uint8)
+    tracking.observe(full_frame_plan, hand_at(160, 120, side=120), 0.0, frame)
+    large = tracking.plan(frame, 0.033)
+    tracking.observe(large, hand_at(160, 120, side=40), 0.033, frame)
+    small = tracking.plan(frame, 0.066)
+    assert tracking.regions == 2
+    assert small.roi[2] - small.roi[0] < large.roi[2] - large.roi[0]
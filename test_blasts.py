@@ -0,0 +1,62 @@
+import math
+import random
+from world import World, blast_radius, zombie_blast_damage, zombie_blast_player_damage
+
+
+def world_with(zombies):
+    # A playing world with only the given (type, x, y, health) zombies and
+    # the collision grid built over them, as at the start of a tick
+    world = World(1280, 720, rng=random.Random(0))
+    world.new_game()
+    world.player_pos = [400, 360]
+    rows = []
+    for kind, x, y, health in zombies:
+        row = world.zombies.spawn(kind, 0)
+        world.zombies.pos[row] = (x, y)
+        world.zombies.health[row] = health
+        rows.append(row)
+    world.grid.build(world.zombies, world.barricades, world.pickups)
+    return world, rows
+
+
+def within(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1]) < blast_radius
+
+
+def test_single_blasts_damage_as_before():
+    contact = (410, 360)
+    rocket, rocket_damage = (520, 360), 3
+    survivors = [(470, 360), (580, 360), (340, 290), (330, 450), (900, 500)]
+    world, rows = world_with([("exploding", *contact, 2)] + [("normal", x, y, 20) for x, y in survivors])
+    world.check_player_zombie_collisions(1000)
+    world.rocket_splash(rocket, rocket_damage)
+    world.resolve_blasts(1000)
+
+    # The per-hit code took rocket damage from every zombie near the impact,
+    # and the contact explosion's damage from every other zombie near it
+    for row, pos in zip(rows[1:], survivors):
+        expected = 20 - rocket_damage * within(pos, rocket) - zombie_blast_damage * within(pos, contact)
+        assert world.zombies.health[row] == expected, pos
+        assert world.zombies.alive[row]
+    assert world.player_health == 100 - zombie_blast_player_damage
+    assert world.events == ["zombie_death"]
+    assert world.score == 0 and world.blasts == []
+
+
+def test_zombie_killed_by_a_blast_dies_and_chains_once():
+    world, (exploding, near, far) = world_with([("exploding", 700, 300, 2),
+                                                ("normal", 780, 300, 20),
+                                                ("normal", 880, 300, 20)])
+    world.rocket_splash((640, 300), 2)
+    world.resolve_blasts(1000)
+
+    # Its own blast does not hit it again, and hits the zombie next to it once
+    assert not world.zombies.alive[exploding]
+    assert world.zombies.health[exploding] == 0
+    assert world.zombies.health[near] == 20 - zombie_blast_damage
+    assert world.zombies.health[far] == 20
+    assert world.events == ["zombie_death"]
+    assert world.score == world.kill_score(exploding)
+    assert world.player_health == 100
+    world.zombies.compact()
+    assert world.zombies.count == 2
@@ -0,0 +1,64 @@
+import random
+import numpy as np
+from gestures import GestureRecognizer, NUM_LANDMARKS, no_hands
+from landmark_log import LandmarkRecorder, LandmarkReplay, RESET
+from world import World, tick_ms
+
+width, height = 1280, 720
+camera_width, camera_height = 320, 240
+
+
+def open_hand(extended):
+    # An upright hand with the given fingers (index to pinky) out and the
+    # thumb well away from the index tip
+    hand = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+    hand[0] = (0.5, 0.8, 0)
+    for tip, x, out in zip((8, 12, 16, 20), (0.44, 0.48, 0.52, 0.56), extended):
+        hand[tip - 3] = (x, 0.62, 0)
+        hand[tip - 2] = (x, 0.55, 0)
+        hand[tip - 1] = (x, 0.5, 0)
+        hand[tip] = (x, 0.45 if out else 0.66, 0)
+    hand[4] = hand[8] + (0.2, 0, 0)
+    return hand[None]
+
+
+def play_live(path, frames):
+    # Runs `frames` the way the game loop does, one tick per frame, recording them
+    world = World(width, height, rng=random.Random(7))
+    recognizer = GestureRecognizer(camera_width, camera_height)
+    recorder = LandmarkRecorder(path, 7, width, height, camera_width, camera_height, 1)
+    for i, hands in enumerate(frames):
+        now = world.clock.now()
+        flags = RESET if i == 0 else 0
+        if flags:
+            world.reset()
+        inputs = recognizer.update(hands, width, height, now)
+        recorder.write(now, hands, flags, inputs)
+        world.step(tick_ms, inputs)
+        world.events.clear()
+    recorder.close(world.clock.now())
+    return world, recorder
+
+
+def test_held_finger_count_replays(tmp_path):
+    path = tmp_path / "held.zlm"
+    frames = [no_hands] + [open_hand((True, True, True, False))] * 30
+    live, recorder = play_live(path, frames)
+    assert live.current_weapon == "machine_gun"
+    # The hold completing is a change of its own, even though the hands did not move
+    assert recorder.records_written == 4
+    replayed = LandmarkReplay(path).play()
+    assert replayed.current_weapon == live.current_weapon
+    assert replayed.clock.now() == live.clock.now()
+    assert replayed.player_pos == live.player_pos
+
+
+def test_switches_between_counts_replay(tmp_path):
+    path = tmp_path / "switches.zlm"
+    frames = ([open_hand((True, True, False, False))] * 20 + [open_hand((True, True, True, True))] * 5 +
+              [open_hand((True, True, True, False))] * 20 + [no_hands] * 3)
+    live, _ = play_live(path, frames)
+    replayed = LandmarkReplay(path).play()
+    assert live.current_weapon == "machine_gun"
+    assert replayed.current_weapon == live.current_weapon
+    assert replayed.score == live.score
@@ -0,0 +1,48 @@
+import random
+import numpy as np
+import pytest
+from spatial_hash import SpatialHash, BruteForceIndex, CollisionGrid
+from world import World, autopilot, tick_ms
+
+
+def lockstep(seed, ticks, width=1280, height=720):
+    # The same seeded game with the grid and with the brute-force reference,
+    # checked against each other every 100 ticks
+    worlds = [World(width, height, rng=random.Random(seed)) for _ in range(2)]
+    worlds[1].grid = CollisionGrid(index_type=BruteForceIndex)
+    for world in worlds:
+        world.new_game()
+    for tick in range(ticks):
+        for world in worlds:
+            world.step(tick_ms, autopilot(world))
+            world.events.clear()
+            if world.state == "game_over":
+                world.reset()
+        if tick % 100 == 99 or tick == ticks - 1:
+            grid, brute = worlds
+            n = grid.zombies.count
+            assert n == brute.zombies.count, f"tick {tick}"
+            assert np.array_equal(grid.zombies.pos[:n], brute.zombies.pos[:n]), f"tick {tick}"
+            assert np.array_equal(grid.zombies.health[:n], brute.zombies.health[:n]), f"tick {tick}"
+            assert (grid.score, grid.high_score, grid.player_health, grid.wave_number) == \
+                (brute.score, brute.high_score, brute.player_health, brute.wave_number), f"tick {tick}"
+            assert [pickup.pos for pickup in grid.pickups] == [pickup.pos for pickup in brute.pickups], f"tick {tick}"
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_grid_matches_brute_force(seed):
+    lockstep(seed, 3000)
+
+
+@pytest.mark.parametrize("cell_size", [16, 128, 500])
+def test_query_returns_every_overlap(cell_size):
+    rng = np.random.default_rng(cell_size)
+    positions = rng.uniform(-200, 1500, (400, 2))
+    extents = rng.uniform(1, 60, 400)
+    index = SpatialHash(cell_size)
+    index.build(positions, extents)
+    for x, y, extent in zip(rng.uniform(-200, 1500, 200), rng.uniform(-200, 1500, 200), rng.uniform(0, 80, 200)):
+        candidates = index.query(x, y, extent)
+        assert np.all(np.diff(candidates) > 0)
+        reach = np.abs(positions - (x, y)).max(axis=1) <= extents + extent
+        assert set(np.flatnonzero(reach)) <= set(candidates.tolist())
@@ -0,0 +1,35 @@
+import random
+from scheduler import Scheduler
+from zombies import ZombieStore, NORMAL, STRONG, FAST, promotion_time
+
+
+def store_with_scheduler():
+    scheduler = Scheduler()
+    return ZombieStore(800, 600, rng=random.Random(1), scheduler=scheduler), scheduler
+
+
+def test_promotion_follows_a_zombie_whose_row_moved():
+    zombies, scheduler = store_with_scheduler()
+    first = zombies.spawn("normal", 0)
+    zombies.spawn("fast", 0)
+    survivor = zombies.id[zombies.spawn("normal", 1000)]
+    zombies.kill(first)
+    zombies.compact()  # The survivor moves into row 0
+    scheduler.run(promotion_time)
+    assert list(zombies.type[:zombies.count]) == [NORMAL, FAST]
+    scheduler.run(1000 + promotion_time)
+    row = zombies._row_of[int(survivor)]
+    assert zombies.type[row] == STRONG and zombies.health[row] == 5
+    assert scheduler.fired == 2
+
+
+def test_row_map_matches_rows_after_removals():
+    zombies, _ = store_with_scheduler()
+    rng = random.Random(3)
+    for step in range(500):
+        if zombies.count and rng.random() < 0.4:
+            zombies.kill(rng.randrange(zombies.count))
+            zombies.compact()
+        else:
+            zombies.spawn(rng.choice(["normal", "fast", "strong"]), step)
+        assert zombies._row_of == {int(zombies.id[i]): i for i in range(zombies.count)}
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+import pygame
+
+
+class TextCache:
+    # Bounded LRU of rendered text surfaces keyed by (font, text, color,
+    # antialias). Fonts come from get_font(), so the font object itself is a
+    # stable key.
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+_fonts = {}
+text_cache = TextCache()
+
+
+def get_font(face, size):
+    # Each (face, size) pair is loaded once for the life of the process
+    font = _fonts.get((face, size))
+    if font is None:
+        font = pygame.font.SysFont(face, size)
+        _fonts[(face, size)] = font
+    return font
+
+
+def render_text(font, text, color, antialias=True):
+    return text_cache.render(font, text, color, antialias)
@@ -0,0 +1,483 @@
+import math
+import random
+import time
+import argparse
+from collections import namedtuple
+import numpy as np
+from zombies import ZombieStore, EXPLODING, BOSS
+from spatial_hash import CollisionGrid
+from flow_field import FlowField
+from scheduler import Scheduler
+from projectiles import ProjectilePool, WEAPON_TYPES, ROCKET, FLAMETHROWER
+from effects import ExplosionEffects
+from profiler import null_profiler
+
+player_size = 40
+player_speed = 5
+weapon_cooldowns = {"pistol": 500, "smg": 100, "machine_gun": 200, "rocket": 1500, "flamethrower": 50}
+weapon_damage = {"pistol": 1, "smg": 1, "machine_gun": 2, "rocket": 20, "flamethrower": 2}
+weapon_ammo_max = {"pistol": float('inf'), "smg": 50, "machine_gun": 60, "rocket": 2, "flamethrower": 100}
+weapon_range = {"pistol": 60, "smg": 30, "machine_gun": 90, "rocket": 60, "flamethrower": 20}
+shield_size = 20
+barricade_size = 50
+explosion_color = (255, 165, 0)
+tick_ms = 1000 / 60  # Game rules move things a fixed amount per step at this rate
+reload_time = 2000
+zombie_spawn_interval = 3000  # ms between top-up spawns during a wave
+pickup_spawn_interval = 20000
+spawn_types = ["normal", "fast", "strong", "exploding"]
+blast_radius = 100
+zombie_blast_damage = 5
+zombie_blast_player_damage = 15
+
+# One tick of player intent. Fields left as None keep the current value:
+# crosshair_pos is where to aim, move_target is where the player walks
+# towards (the wrist) and weapon is the weapon being asked for.
+PlayerInput = namedtuple("PlayerInput", ["crosshair_pos", "move_target", "shoot", "weapon"],
+                         defaults=[None, None, False, None])
+
+# An area-of-effect hit waiting to be resolved at the end of the tick.
+# Only a zombie that blew up on contact with the player hurts the player.
+Blast = namedtuple("Blast", ["pos", "damage", "hurts_player"])
+
+
+class SimClock:
+    # Game time in ms. It only moves when the world steps, so a simulation
+    # runs as fast as the CPU allows and is identical from run to run.
+    def __init__(self, start=0):
+        self.ms = start
+
+    def now(self):
+        return self.ms
+
+    def advance(self, dt):
+        self.ms += dt
+
+
+ammo_pickup_value = {"smg": 20, "machine_gun": 30, "rocket": 1, "flamethrower": 50}
+
+
+# Pickups and barricades are reused through World's free lists, so each
+# sets itself up in respawn(), which puts an old object back in play in place.
+class ShieldPickup:
+    __slots__ = ("pos", "size", "value")
+
+    def __init__(self, rng, width, height):
+        self.pos = [0, 0]
+        self.respawn(rng, width, height)
+
+    def respawn(self, rng, width, height):
+        self.pos[0] = rng.randint(shield_size, width - shield_size)
+        self.pos[1] = rng.randint(shield_size, height - shield_size)
+        self.size = shield_size
+        self.value = 20
+
+class AmmoPickup:
+    __slots__ = ("pos", "size", "value")
+
+    def __init__(self, rng, width, height):
+        self.pos = [0, 0]
+        self.respawn(rng, width, height)
+
+    def respawn(self, rng, width, height):
+        self.pos[0] = rng.randint(shield_size, width - shield_size)
+        self.pos[1] = rng.randint(shield_size, height - shield_size)
+        self.size = shield_size
+        self.value = ammo_pickup_value
+
+class HealthKit:
+    __slots__ = ("pos", "size", "value")
+
+    def __init__(self, rng, width, height):
+        self.pos = [0, 0]
+        self.respawn(rng, width, height)
+
+    def respawn(self, rng, width, height):
+        self.pos[0] = rng.randint(shield_size, width - shield_size)
+        self.pos[1] = rng.randint(shield_size, height - shield_size)
+        self.size = shield_size
+        self.value = 25
+
+class Barricade:
+    __slots__ = ("pos", "size", "health")
+
+    def __init__(self, rng, width, height):
+        self.pos = [0, 0]
+        self.respawn(rng, width, height)
+
+    def respawn(self, rng, width, height):
+        self.pos[0] = rng.randint(barricade_size, width - barricade_size)
+        self.pos[1] = rng.randint(barricade_size, height - barricade_size)
+        self.size = barricade_size
+        self.health = 50
+
+    def hit(self, damage):
+        self.health -= damage
+        return self.health <= 0
+
+
+def check_collision(pos, size, obstacles, index):
+    for i in index.query(pos[0], pos[1], size//2):
+        obstacle = obstacles[i]
+        dx = pos[0] - obstacle.pos[0]
+        dy = pos[1] - obstacle.pos[1]
+        dist = math.sqrt(dx*dx + dy*dy)
+        if dist < size//2 + obstacle.size//2:
+            return True
+    return False
+
+
+class World:
+    # The whole game simulation, with no display, camera or audio. Time comes
+    # from `clock` and randomness from `rng`. Sounds are reported as names in
+    # `events` for the caller to play and clear. A FrameProfiler with "sim"
+    # and "collisions" stages can be set as `profiler` to time each step.
+    def __init__(self, width, height, clock=None, rng=None, profiler=null_profiler):
+        self.width = width
+        self.height = height
+        self.clock = clock if clock is not None else SimClock()
+        self.rng = rng if rng is not None else random.Random()
+        self.profiler = profiler
+        self.events = []
+        self.blasts = []
+        self.free_entities = {}  # Entity class -> objects out of play, reused by make()
+        self.pickups = []
+        self.barricades = []
+        # Stores are cleared in place by new_game() rather than rebuilt
+        self.scheduler = Scheduler()
+        self.zombies = ZombieStore(width, height, rng=self.rng, scheduler=self.scheduler)
+        self.bullets = ProjectilePool(width, height)
+        self.explosions = ExplosionEffects(explosion_color)
+        self.grid = CollisionGrid()
+        self.flow_field = FlowField(width, height)
+        self.high_score = 0
+        self.state = "menu"
+        self.crosshair_pos = [width//2, height//2]  # Start in center of full screen
+        self.current_weapon = "pistol"
+        self.last_shoot_time = 0
+        self.max_zombies = 10
+        self.new_game()
+        self.state = "menu"
+
+    def new_game(self):
+        now = self.clock.now()
+        self.scheduler.clear()  # Every timer of the last game goes
+        self.zombies.clear()
+        self.bullets.clear()
+        self.explosions.clear()
+        self.score = 0
+        self.player_health = 100
+        self.player_shield = 0
+        self.level = 1
+        self.player_pos = [self.width//2, self.height//2]  # Start in center of full screen
+        self.state = "playing"
+        self.wave_number = 0
+        self.ammo = {"pistol": float('inf'), "smg": 50, "machine_gun": 60, "rocket": 2, "flamethrower": 100}
+        self.reload_times = {"pistol": 0, "smg": 0, "machine_gun": 0, "rocket": 0, "flamethrower": 0}
+        for entity in self.pickups + self.barricades:
+            self.recycle(entity)
+        self.pickups = [self.make(ShieldPickup) for _ in range(2)] + [self.make(AmmoPickup)] + [self.make(HealthKit)]
+        self.barricades = [self.make(Barricade) for _ in range(3)]
+        self.game_start_time = now
+        self.boss_spawned = False
+        self.zombie_spawn_timer = self.scheduler.schedule(now + zombie_spawn_interval, self.spawn_zombie,
+                                                          interval=zombie_spawn_interval)
+        self.pickup_spawn_timer = self.scheduler.schedule(now + pickup_spawn_interval, self.spawn_pickup,
+                                                          interval=pickup_spawn_interval)
+
+    def reset(self):
+        self.high_score = max(self.high_score, self.score)
+        self.new_game()
+
+    def make(self, kind):
+        free = self.free_entities.get(kind)
+        if free:
+            entity = free.pop()
+            entity.respawn(self.rng, self.width, self.height)
+            return entity
+        return kind(self.rng, self.width, self.height)
+
+    def recycle(self, entity):
+        self.free_entities.setdefault(type(entity), []).append(entity)
+
+    def step(self, dt, inputs):
+        with self.profiler.section("sim"):
+            self._step(dt, inputs)
+
+    def _step(self, dt, inputs):
+        now = self.clock.now()
+        with self.profiler.section("collisions"):
+            self.grid.build(self.zombies, self.barricades, self.pickups)
+        self.apply_input(inputs, now)
+        if self.state != "playing":
+            self.clock.advance(dt)
+            return
+
+        self.explosions.advance()
+        culled = self.bullets.step(self.grid.barricade_positions, barricade_size//2)
+        for bullet in culled:
+            if self.bullets.weapon[bullet] == ROCKET:
+                self.explosions.spawn(self.bullets.pos[bullet], 100)
+        self.bullets.release(culled)
+
+        with self.profiler.section("collisions"):
+            self.check_bullet_zombie_collisions(now)
+            self.check_player_zombie_collisions(now)
+            self.resolve_blasts(now)
+            self.check_player_pickup_collisions()
+            self.zombies.compact()
+
+        if not self.zombies and self.state == "playing":
+            self.wave_number += 1
+            self.boss_spawned = False
+            if self.wave_number % 3 == 0:
+                zombie = self.zombies.spawn("boss", now)
+                self.zombies.health[zombie] += self.level * 5
+                self.boss_spawned = True
+            else:
+                for _ in range(self.max_zombies + self.wave_number):
+                    self.zombies.spawn(self.rng.choice(spawn_types), now)
+
+        # Spawns, reloads and zombie promotions that are due
+        self.scheduler.run(now)
+
+        self.flow_field.update(self.player_pos, self.grid.barricade_positions, barricade_size / 2)
+        self.zombies.update(self.player_pos, self.level, now, self.flow_field)
+        self.clock.advance(dt)
+
+    def apply_input(self, inputs, now):
+        if inputs.crosshair_pos is not None:
+            self.crosshair_pos = list(inputs.crosshair_pos)
+        if inputs.move_target is not None:
+            self.move_player(inputs.move_target)
+        if inputs.weapon is not None:
+            self.current_weapon = inputs.weapon
+        if inputs.shoot and self.state == "playing":
+            self.shoot(now)
+            if self.ammo[self.current_weapon] == 0 and self.reload_times[self.current_weapon] == 0:
+                self.reload_times[self.current_weapon] = now
+                self.scheduler.schedule(now + reload_time, self.reload, self.current_weapon)
+
+    # Timer callbacks. A spawn that is not allowed when it comes due is tried
+    # again every tick, and the interval restarts once it happens.
+    def spawn_zombie(self, now):
+        if len(self.zombies) >= self.max_zombies + self.wave_number or self.boss_spawned:
+            return now + tick_ms
+        self.zombies.spawn(self.rng.choice(spawn_types), now)
+
+    def spawn_pickup(self, now):
+        if len(self.pickups) >= 6:
+            return now + tick_ms
+        self.pickups.append(self.make(self.rng.choice([ShieldPickup, AmmoPickup, HealthKit])))
+
+    def reload(self, now, weapon):
+        # Ammo picked up while reloading is kept; only an empty weapon refills
+        if self.ammo[weapon] == 0:
+            self.ammo[weapon] = weapon_ammo_max[weapon]
+        self.reload_times[weapon] = 0
+
+    def move_player(self, target):
+        dx = target[0] - self.player_pos[0]
+        dy = target[1] - self.player_pos[1]
+        dist = math.sqrt(dx*dx + dy*dy)
+        if dist > 0:
+            move_x = (dx / dist) * min(player_speed, dist)
+            move_y = (dy / dist) * min(player_speed, dist)
+            temp_pos = [self.player_pos[0] + move_x, self.player_pos[1] + move_y]
+            if not check_collision(temp_pos, player_size, self.barricades, self.grid.barricades):
+                self.player_pos[0] = max(player_size//2, min(self.width - player_size//2, temp_pos[0]))  # Full width
+                self.player_pos[1] = max(player_size//2, min(self.height - player_size//2, temp_pos[1]))  # Full height
+
+    def shoot(self, now):
+        weapon = self.current_weapon
+        if now - self.last_shoot_time < weapon_cooldowns[weapon] or self.ammo[weapon] <= 0 or \
+                self.crosshair_pos[0] > self.width or self.crosshair_pos[1] > self.height:
+            return
+        speed = 10 if weapon not in ("rocket", "flamethrower") else 5
+        size = 12 if weapon == "rocket" else 8 if weapon != "flamethrower" else 6
+        if self.bullets.spawn(self.player_pos[0], self.player_pos[1], self.crosshair_pos[0], self.crosshair_pos[1],
+                              WEAPON_TYPES.index(weapon), speed, size, weapon_range[weapon], weapon_damage[weapon]) < 0:
+            return
+        self.events.append("shoot")
+        self.ammo[weapon] -= 1
+        self.last_shoot_time = now
+
+    def damage_player(self, damage):
+        if self.player_shield > 0:
+            self.player_shield -= damage
+            if self.player_shield < 0:
+                self.player_health += self.player_shield
+                self.player_shield = 0
+        else:
+            self.player_health -= damage
+
+    def explode_zombie(self, zombie, hurts_player=False):
+        # Only exploding zombies blow up. Explosions set off by bullets or
+        # rockets never reached the player, so only a zombie touching the
+        # player passes hurts_player.
+        if self.zombies.type[zombie] == EXPLODING:
+            self.blasts.append(Blast(self.zombies.pos[zombie].copy(), zombie_blast_damage, hurts_player))
+
+    def kill_score(self, zombie):
+        return 10 * self.level * (2 if self.zombies.type[zombie] == BOSS else 1)
+
+    def rocket_splash(self, pos, damage):
+        self.blasts.append(Blast(np.array(pos, dtype=np.float64), damage, False))
+
+    def resolve_blasts(self, now):
+        # Resolves the tick's blasts breadth first: every blast of a wave
+        # damages the live zombies within blast_radius (one grid query and
+        # one distance test each), then the zombies those blasts killed die
+        # together, in index order, and the exploding ones among them make up
+        # the next wave. Kills, score, sounds and player damage are applied
+        # once the chain has burnt out.
+        if not self.blasts:
+            return
+        zombies = self.zombies
+        dying = np.zeros(zombies.count, dtype=bool)
+        player_damage = 0
+        centres = []
+        wave = self.blasts
+        while wave:
+            hit = np.zeros(zombies.count, dtype=bool)
+            for blast in wave:
+                pos = blast.pos
+                centres.append(pos)
+                near = self.grid.zombies.query(pos[0], pos[1], blast_radius)
+                near = near[zombies.alive[near] & ~dying[near]]
+                delta = zombies.pos[near] - pos
+                near = near[np.hypot(delta[:, 0], delta[:, 1]) < blast_radius]
+                zombies.health[near] -= blast.damage
+                zombies.last_hit_time[near] = now
+                hit[near] = True
+                if blast.hurts_player and math.hypot(self.player_pos[0] - pos[0], self.player_pos[1] - pos[1]) < blast_radius:
+                    player_damage += zombie_blast_player_damage
+            killed = np.flatnonzero(hit & (zombies.health[:zombies.count] <= 0))
+            dying[killed] = True
+            wave = [Blast(zombies.pos[z].copy(), zombie_blast_damage, False) for z in killed[zombies.type[killed] == EXPLODING]]
+        self.blasts = []
+        # A chain through a crowd sets off many blasts on top of each other;
+        # one effect per half-radius cell looks the same and draws far less
+        centres = np.array(centres)
+        cells = np.floor(centres / (blast_radius / 2)).astype(np.int64)
+        _, first = np.unique(cells, axis=0, return_index=True)
+        for pos in centres[np.sort(first)]:
+            self.explosions.spawn(pos, blast_radius)
+        dead = np.flatnonzero(dying)
+        if len(dead):
+            zombies.alive[dead] = False
+            self.score += sum(self.kill_score(z) for z in dead)
+            self.events.extend(["zombie_death"] * len(dead))
+        if player_damage:
+            self.damage_player(player_damage)
+            if self.player_health <= 0 and self.state == "playing":
+                self.events.append("game_over")
+                self.state = "game_over"
+
+    def check_bullet_zombie_collisions(self, now):
+        zombies = self.zombies
+        bullets = self.bullets
+        missed = []
+        for bullet in bullets.active_indices():
+            bullet_pos = bullets.pos[bullet]
+            bullet_size = bullets.size[bullet]
+            candidates = self.grid.zombies.query(bullet_pos[0], bullet_pos[1], bullet_size//2)
+            candidates = candidates[zombies.alive[candidates]]
+            delta = zombies.pos[candidates] - bullet_pos
+            hits = candidates[np.hypot(delta[:, 0], delta[:, 1]) < zombies.size[candidates]//2 + bullet_size//2]
+            if not len(hits):
+                missed.append(bullet)
+                continue
+            zombie = hits[0]
+            bullets.release([bullet])
+            damage = bullets.damage[bullet]
+            if bullets.weapon[bullet] == ROCKET:
+                self.rocket_splash(bullet_pos, damage)
+            elif bullets.weapon[bullet] == FLAMETHROWER:
+                zombies.hit(zombie, damage, now)
+                if now % 500 < 60:
+                    zombies.hit(zombie, 1, now)
+            elif zombies.hit(zombie, damage, now):
+                self.explode_zombie(zombie)
+                zombies.kill(zombie)
+                self.score += self.kill_score(zombie)
+                self.events.append("zombie_death")
+        # Bullets that hit nothing advance a second step this tick, as before
+        culled = bullets.step(self.grid.barricade_positions, barricade_size//2, np.array(missed, dtype=np.intp))
+        for bullet in culled:
+            if bullets.weapon[bullet] == ROCKET:
+                self.rocket_splash(bullets.pos[bullet], bullets.damage[bullet])
+        bullets.release(culled)
+
+    def check_player_zombie_collisions(self, now):
+        zombies = self.zombies
+        player_pos = self.player_pos
+        candidates = self.grid.zombies.query(player_pos[0], player_pos[1], player_size//2)
+        candidates = candidates[zombies.alive[candidates]]
+        delta = zombies.pos[candidates] - player_pos
+        touching = candidates[np.hypot(delta[:, 0], delta[:, 1]) < zombies.size[candidates]//2 + player_size//2]
+        for zombie in touching:
+            if zombies.type[zombie] == EXPLODING:
+                self.explode_zombie(zombie, hurts_player=True)
+            else:
+                self.damage_player(30 if zombies.type[zombie] == BOSS else 15)
+            zombies.kill(zombie)
+            self.events.append("zombie_death")
+            if self.player_health <= 0:
+                self.events.append("game_over")
+                self.state = "game_over"
+
+    def check_player_pickup_collisions(self):
+        collected = []
+        for i in self.grid.pickups.query(self.player_pos[0], self.player_pos[1], player_size//2):
+            pickup = self.pickups[i]
+            dx = pickup.pos[0] - self.player_pos[0]
+            dy = pickup.pos[1] - self.player_pos[1]
+            dist = math.sqrt(dx*dx + dy*dy)
+            if dist < pickup.size//2 + player_size//2:
+                if isinstance(pickup, ShieldPickup):
+                    self.player_shield += pickup.value
+                elif isinstance(pickup, HealthKit):
+                    self.player_health = min(100, self.player_health + pickup.value)
+                elif isinstance(pickup, AmmoPickup):
+                    for weapon in self.ammo:
+                        if weapon != "pistol":
+                            self.ammo[weapon] = min(weapon_ammo_max[weapon], self.ammo[weapon] + pickup.value.get(weapon, 0))
+                collected.append(i)
+        for i in reversed(collected):
+            self.recycle(self.pickups.pop(i))
+
+
+def autopilot(world):
+    # Scripted player for headless runs: stand still, aim at the nearest
+    # zombie and keep the trigger held.
+    zombies = world.zombies
+    if not zombies:
+        return PlayerInput(shoot=True)
+    delta = zombies.pos[:zombies.count] - world.player_pos
+    nearest = int(np.argmin(np.hypot(delta[:, 0], delta[:, 1])))
+    return PlayerInput(crosshair_pos=zombies.pos[nearest].tolist(), shoot=True)
+
+
+def simulate(seed, ticks, width=1280, height=720, policy=autopilot):
+    world = World(width, height, rng=random.Random(seed))
+    world.new_game()
+    for _ in range(ticks):
+        world.step(tick_ms, policy(world))
+        world.events.clear()
+        if world.state == "game_over":
+            world.reset()
+    return world
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the game simulation headless")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ticks", type=int, default=36000)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    world = simulate(args.seed, args.ticks)
+    elapsed = time.perf_counter() - start
+    print(f"{args.ticks} ticks in {elapsed:.2f}s ({args.ticks / elapsed:.0f} ticks/s, "
+          f"{args.ticks * tick_ms / 1000 / elapsed:.0f}x real time)")
+    print(f"wave {world.wave_number}, score {world.score}, high score {world.high_score}")
@@ -0,0 +1,149 @@
+import random
+import numpy as np
+
+ZOMBIE_TYPES = ("normal", "fast", "strong", "exploding", "boss")
+NORMAL, FAST, STRONG, EXPLODING, BOSS = range(len(ZOMBIE_TYPES))
+
+hit_flash_time = 150
+promotion_time = 10000  # Normal zombies turn strong after this many ms
+
+
+class ZombieStore:
+    # All zombies as parallel arrays (structure of arrays). Zombie `i` is row
+    # `i` of every array for i < count; rows past count are free space. Rows
+    # move on removal, so each zombie also has an id that stays the same for
+    # its whole life, and `_row_of` maps live ids to their current rows.
+    def __init__(self, width, height, capacity=64, rng=random, scheduler=None):
+        self.width = width
+        self.height = height
+        self.rng = rng
+        self.scheduler = scheduler  # Without one, normal zombies are never promoted
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float64)
+        self.speed = np.zeros(capacity, dtype=np.float64)
+        self.health = np.zeros(capacity, dtype=np.float64)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.type = np.zeros(capacity, dtype=np.int8)
+        self.last_hit_time = np.zeros(capacity, dtype=np.int64)
+        self.hit_flash = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.id = np.zeros(capacity, dtype=np.int64)
+        self._row_of = {}
+        self._next_id = 0
+
+    def __len__(self):
+        return self.count
+
+    def _fields(self):
+        return ("pos", "speed", "health", "size", "type", "last_hit_time", "hit_flash", "alive", "id")
+
+    def _grow(self):
+        for name in self._fields():
+            old = getattr(self, name)
+            new = np.zeros((len(old) * 2,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def clear(self):
+        self.count = 0
+        self._row_of.clear()
+
+    def spawn(self, zombie_type, now):
+        if self.count == len(self.speed):
+            self._grow()
+        i = self.count
+        rng = self.rng
+        edge = rng.randint(0, 3)
+        if edge == 0: self.pos[i] = (rng.randint(0, self.width), -20)
+        elif edge == 1: self.pos[i] = (self.width + 20, rng.randint(0, self.height))
+        elif edge == 2: self.pos[i] = (rng.randint(0, self.width), self.height + 20)
+        else: self.pos[i] = (-20, rng.randint(0, self.height))
+
+        code = ZOMBIE_TYPES.index(zombie_type)
+        if code == FAST:
+            size, speed, health = 25, rng.uniform(1.2, 1.8), 1
+        elif code == STRONG:
+            size, speed, health = 50, rng.uniform(0.4, 0.8), 5
+        elif code == EXPLODING:
+            size, speed, health = 40, rng.uniform(1.5, 2.0), 2
+        elif code == BOSS:
+            size, speed, health = 80, 0.6, 20
+        else:  # normal
+            size, speed, health = rng.randint(30, 50), rng.uniform(0.6, 1.0), 2
+        self.type[i] = code
+        self.size[i] = size
+        self.speed[i] = speed
+        self.health[i] = health
+        self.last_hit_time[i] = 0
+        self.hit_flash[i] = False
+        self.alive[i] = True
+        self.id[i] = self._next_id
+        self._row_of[self._next_id] = i
+        self._next_id += 1
+        self.count += 1
+        if code == NORMAL and self.scheduler is not None:
+            self.scheduler.schedule(now + promotion_time, self.promote, int(self.id[i]))
+        return i
+
+    def remove(self, i):
+        # O(1) removal: the last zombie moves into the freed row, so indices
+        # greater than or equal to `i` are not stable across a remove.
+        last = self.count - 1
+        del self._row_of[int(self.id[i])]
+        if i != last:
+            for name in self._fields():
+                array = getattr(self, name)
+                array[i] = array[last]
+            self._row_of[int(self.id[i])] = i
+        self.count = last
+
+    def kill(self, i):
+        # Deferred removal: indices stay stable until compact() is called, so
+        # a broad phase built this tick keeps pointing at the right rows.
+        self.alive[i] = False
+
+    def compact(self):
+        for i in np.flatnonzero(~self.alive[:self.count])[::-1]:
+            self.remove(i)
+
+    def hit(self, i, damage, now):
+        self.health[i] -= damage
+        self.last_hit_time[i] = now
+        return self.health[i] <= 0
+
+    def update(self, player_pos, level, now, field=None):
+        # With a FlowField zombies walk around barricades; without one they
+        # head straight for the player
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        zombie_type = self.type[:n]
+        if field is not None:
+            direction, dist = field.directions(pos, player_pos)
+        else:
+            delta = np.asarray(player_pos, dtype=np.float64) - pos
+            dist = np.hypot(delta[:, 0], delta[:, 1])
+            direction = delta / np.maximum(dist, 1e-12)[:, None]
+        adjusted_speed = self.speed[:n] + np.where(zombie_type != BOSS, level * 0.03, 0.0)
+        moving = dist > 0
+        pos[moving] += direction[moving] * adjusted_speed[moving, None]
+
+        half = self.size[:n] // 2
+        np.minimum(pos[:, 0], self.width - half, out=pos[:, 0])
+        np.minimum(pos[:, 1], self.height - half, out=pos[:, 1])
+        np.maximum(pos[:, 0], half, out=pos[:, 0])
+        np.maximum(pos[:, 1], half, out=pos[:, 1])
+
+        self.hit_flash[:n] = now - self.last_hit_time[:n] < hit_flash_time
+
+    def promote(self, now, zombie_id):
+        # Timer callback, one per normal zombie spawned. The zombie is found
+        # by id, since its row may have moved; one that has died is skipped.
+        i = self._row_of.get(zombie_id)
+        if i is None or not self.alive[i] or self.type[i] != NORMAL:
+            return
+        self.type[i] = STRONG
+        self.size[i] = 50
+        self.speed[i] = self.rng.uniform(0.4, 0.8)
+        self.health[i] = 5